@@ -2,11 +2,22 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from workbook_cache import read_sheet
+from excel_stream import MONTHLY_VOLUME_SCHEMA
+from prefix_index import PrefixSumIndex
+from vintages import latest_workbook, workbooks_version
+from dataset_registry import DatasetRegistry
+from downsample import downsample
 
 st.set_page_config(page_title="Monthly Container Throughput", layout="wide")
 st.title("Container Throughput (Top 5 Highlighted, Timeframe Selectable)")
 
-file_path = "Monthly container volume -  Quarterly sales and NPATMI_Aug 2025.xlsx"
+# Newest monthly edition in data/
+file_path = latest_workbook()
 sheet_name = "Monthly container volume"
 
 # Color palette from new attachment (for top 5)
@@ -20,51 +31,65 @@ color_palette = [
 ]
 
 def aggregate_timeframe(df, date_col, company_col, value_col, timeframe):
-    df = df.copy()
-    df[date_col] = pd.to_datetime(df[date_col])
+    # Period keys are grouped on directly, so the (shared) input frame is never copied or modified
+    dates = pd.to_datetime(df[date_col])
     if timeframe == 'Monthly':
-        df['Period'] = df[date_col].dt.to_period('M').astype(str)
+        period = dates.dt.to_period('M').astype(str)
     elif timeframe == 'Quarterly':
-        df['Period'] = df[date_col].dt.to_period('Q').astype(str)
+        period = dates.dt.to_period('Q').astype(str)
     elif timeframe == 'Semi-Annual':
-        df['Period'] = df[date_col].dt.year.astype(str) + '-H' + ((df[date_col].dt.month-1)//6+1).astype(str)
+        period = dates.dt.year.astype(str) + '-H' + ((dates.dt.month-1)//6+1).astype(str)
     elif timeframe == 'Annual':
-        df['Period'] = df[date_col].dt.year.astype(str)
+        period = dates.dt.year.astype(str)
     elif timeframe == 'Year-to-Date':
         this_year = pd.Timestamp.now().year
-        df = df[df[date_col].dt.year == this_year]
-        df['Period'] = str(this_year) + '-YTD'
+        df = df[dates.dt.year == this_year]
+        period = pd.Series(str(this_year) + '-YTD', index=df.index)
     else:
-        df['Period'] = df[date_col].dt.to_period('M').astype(str)
-    grouped = df.groupby(['Period', company_col], as_index=False)[value_col].sum()
+        period = dates.dt.to_period('M').astype(str)
+    grouped = df.groupby([period.rename('Period'), company_col], as_index=False)[value_col].sum()
     pivot_df = grouped.pivot(index='Period', columns=company_col, values=value_col).fillna(0)
     return pivot_df
 
 def calculate_growth(series, period_lag):
     return (series - series.shift(period_lag)) / series.shift(period_lag) * 100
 
-def calculate_ytd_growth(df, date_col, company_col, value_col, selected_companies):
-    df = df.copy()
-    df[date_col] = pd.to_datetime(df[date_col])
+def calculate_ytd_growth(index, selected_companies):
     this_year = pd.Timestamp.now().year
-    # Find latest month in this year
-    this_year_months = df[df[date_col].dt.year == this_year][date_col].dt.month.unique()
-    if len(this_year_months) == 0:
+    # Find latest indexed month in this year
+    if not index.n_months:
+        return None, None, None
+    latest = min(index.month_start(index.last_month), pd.Timestamp(this_year, 12, 1))
+    if latest.year != this_year:
         return None, None, None
-    latest_month = max(this_year_months)
-    # This year YTD: Jan to latest_month
-    mask_this = (df[date_col].dt.year == this_year) & (df[date_col].dt.month <= latest_month)
-    mask_last = (df[date_col].dt.year == this_year - 1) & (df[date_col].dt.month <= latest_month)
-    ytd_this = df[mask_this & df[company_col].isin(selected_companies)][value_col].sum()
-    ytd_last = df[mask_last & df[company_col].isin(selected_companies)][value_col].sum()
-    if ytd_last == 0:
+    # This year YTD: Jan to latest month, against the same months last year
+    ytd_this, ytd_last = index.same_period_last_year(selected_companies, pd.Timestamp(this_year, 1, 1), latest)
+    if not ytd_last:
         growth = None
     else:
         growth = (ytd_this - ytd_last) / ytd_last * 100
     return ytd_this, ytd_last, growth
 
+@st.cache_resource
+def datasets():
+    return DatasetRegistry.from_env()
+
+def load_sheet(version):
+    # Parsed once per workbook version and shared read-only by every session
+    def load():
+        df = read_sheet(file_path, sheet_name=sheet_name, schema=MONTHLY_VOLUME_SCHEMA)
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'])
+        return df
+    return datasets().get_or_load(('sheet', version), load)
+
+def build_prefix_index(df, version):
+    return datasets().get_or_load(('prefix_index', version), lambda: PrefixSumIndex.from_frame(
+        df, 'Date', 'Company', 'Total throughput'))
+
 try:
-    df = pd.read_excel(file_path, sheet_name=sheet_name)
+    version = workbooks_version({os.path.basename(file_path): file_path})
+    df = load_sheet(version)
     # Ensure required columns exist
     required_cols = {'Date', 'Company', 'Total throughput'}
     if not required_cols.issubset(df.columns):
@@ -72,8 +97,8 @@ try:
         st.write("Available columns:", df.columns.tolist())
         st.stop()
 
-    # Convert Date column to datetime
-    df['Date'] = pd.to_datetime(df['Date'])
+    # Company x month prefix sums answer range totals without rescanning rows
+    index = build_prefix_index(df, version)
 
     # Get unique companies from the data
     available_companies = df['Company'].dropna().unique().tolist()
@@ -95,6 +120,11 @@ try:
         index=0
     )
 
+    # Optional LTTB downsampling of the growth series
+    max_points = None
+    if st.sidebar.checkbox("Downsample long growth series", value=False):
+        max_points = st.sidebar.slider("Max points per growth series", 20, 500, 120, step=10)
+
     # Sidebar for date range selection
     st.sidebar.header("Date Range Selection")
     min_date = df['Date'].min().date()
@@ -118,7 +148,7 @@ try:
     filtered_df = df[df['Company'].isin(selected_companies)]
 
     # Group by Company (all months), sum throughput to get top 5
-    total_by_company = filtered_df.groupby('Company')['Total throughput'].sum().sort_values(ascending=False)
+    total_by_company = index.totals(start_date, end_date, selected_companies).sort_values(ascending=False)
     top5_companies = total_by_company.head(5).index.tolist()
 
     # Aggregate by selected timeframe (convert to thousand TEUs)
@@ -175,10 +205,20 @@ try:
     st.plotly_chart(fig, use_container_width=True)
     st.dataframe(pivot_df[present_companies])
 
+    # Selected range against the same months one year earlier
+    range_this, range_last = index.same_period_last_year(present_companies, start_date, end_date)
+    st.metric(
+        "Selected range vs same period last year (thousand TEUs)",
+        f"{range_this/1000:,.0f}",
+        f"{(range_this - range_last) / range_last * 100:.2f}%" if range_last else None
+    )
+    if range_last is None:
+        st.caption("Same period last year: n/a (starts before the first month of data)")
+
     # Growth chart below
     st.subheader("Growth Chart")
     if timeframe == 'Year-to-Date':
-        ytd_this, ytd_last, ytd_growth = calculate_ytd_growth(df, 'Date', 'Company', 'Total throughput', present_companies)
+        ytd_this, ytd_last, ytd_growth = calculate_ytd_growth(index, present_companies)
         if ytd_this is None or ytd_last is None:
             st.info("Not enough data to calculate Year-to-Date growth.")
         else:
@@ -208,17 +248,19 @@ try:
             else:
                 yoy_lag = 1
             yoy_growth = calculate_growth(total_series, yoy_lag)
+            pop_growth = downsample(pop_growth, max_points)
+            yoy_growth = downsample(yoy_growth, max_points)
 
             growth_fig = go.Figure()
             growth_fig.add_trace(go.Scatter(
-                x=total_series.index,
+                x=pop_growth.index,
                 y=pop_growth,
                 mode='lines+markers',
                 name='Period-on-Period Growth (%)',
                 line=dict(color=color_palette[1], width=2)
             ))
             growth_fig.add_trace(go.Scatter(
-                x=total_series.index,
+                x=yoy_growth.index,
                 y=yoy_growth,
                 mode='lines+markers',
                 name='Year-on-Year Growth (%)',
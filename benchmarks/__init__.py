@@ -0,0 +1,2 @@
+# Dashboard pipeline benchmarks on synthetic data; run from the repository root with
+#   python -m benchmarks.pipeline --ports 33 300 --years 6 20 --output bench.jsonl
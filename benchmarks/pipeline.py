@@ -0,0 +1,102 @@
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+import container_volume_dashboard as dashboard
+import workbook_cache
+from benchmarks.synthetic import generate_monthly_volume, write_workbook
+from volume_cube import VolumeCube
+
+PERIODS = ['Monthly', 'Quarterly', 'Semi-annually', 'Year-to-date']
+SHEET = 'Monthly container volume'
+WORKBOOK_DIR = os.path.join(os.path.dirname(workbook_cache.CACHE_DIR), 'benchmarks')
+
+def _time(fn: Callable, repeats: int, setup: Callable = None) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'min_s': min(samples), 'median_s': statistics.median(samples), 'repeats': repeats}
+
+def _workbook(df, n_ports: int, n_companies: int, n_years: int, seed: int) -> str:
+    # Writing large workbooks is slow, so each size is generated once and reused
+    path = os.path.join(WORKBOOK_DIR, f'synthetic-p{n_ports}-c{n_companies}-y{n_years}-s{seed}.xlsx')
+    if not os.path.exists(path):
+        os.makedirs(WORKBOOK_DIR, exist_ok=True)
+        write_workbook(df, path)
+    return path
+
+def _cold_load(path: str) -> Callable:
+    def setup():
+        dashboard.datasets().clear()
+        workbook_cache.invalidate(path, SHEET)
+    return setup
+
+def bench_size(n_ports: int, n_companies: int, n_years: int, seed: int = 0, repeats: int = 3,
+               excel: bool = True) -> List[Dict]:
+    """Time every dashboard stage for one synthetic data size and every period mode"""
+    df = generate_monthly_volume(n_ports, n_companies, n_years, seed=seed)
+    size = {'n_ports': n_ports, 'n_companies': n_companies, 'n_years': n_years, 'rows': len(df)}
+    results = []
+
+    def record(stage: str, timing: Dict[str, float], period: str = None):
+        results.append({'stage': stage, 'period': period, **size, **timing})
+
+    if excel:
+        path = _workbook(df, n_ports, n_companies, n_years, seed)
+        record('load_data_cold', _time(lambda: dashboard.load_data(path), repeats, _cold_load(path)))
+        dashboard.load_data(path)
+        record('load_data_sidecar', _time(lambda: dashboard.load_data(path), repeats, dashboard.datasets().clear))
+        df = dashboard.load_data(path)
+
+    record('cube_build', _time(lambda: VolumeCube.from_frame(df), repeats))
+    cube = VolumeCube.from_frame(df)
+    companies = sorted(df['Company'].unique())
+
+    for period in PERIODS:
+        record('cube_to_periods', _time(lambda: cube.select(companies=companies).to_periods(period).trim(), repeats), period)
+        period_cube = cube.select(companies=companies).to_periods(period).trim().scaled(1 / 1000)
+        labels = period_cube.labels
+        record('calculate_growth_rates', _time(lambda: dashboard.calculate_growth_rates(period_cube.totals(), period), repeats), period)
+        growth_data, pop_label = dashboard.calculate_growth_rates(period_cube.totals(), period)
+        growth_data['Period_Label'] = labels
+        # to_dict() forces Altair to validate and serialize the full spec, as rendering does
+        record('create_stacked_chart', _time(
+            lambda: dashboard.create_stacked_chart(period_cube, companies, labels).to_dict(), repeats), period)
+        record('create_growth_chart', _time(
+            lambda: dashboard.create_growth_chart(growth_data, labels, True, True, pop_label).to_dict(), repeats), period)
+    return results
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the container volume dashboard pipeline on synthetic data')
+    parser.add_argument('--ports', type=int, nargs='+', default=[33, 100, 300])
+    parser.add_argument('--companies', type=int, nargs='+', default=[14])
+    parser.add_argument('--years', type=int, nargs='+', default=[6, 20])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-excel', action='store_true', help='skip workbook write/load stages')
+    parser.add_argument('--output', help='JSON Lines output file (default: stdout)')
+    args = parser.parse_args(argv)
+
+    out = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for n_ports, n_companies, n_years in itertools.product(args.ports, args.companies, args.years):
+            if n_companies > n_ports:
+                continue
+            for row in bench_size(n_ports, n_companies, n_years, args.seed, args.repeats, not args.no_excel):
+                out.write(json.dumps(row) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == '__main__':
+    main()
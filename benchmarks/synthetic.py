@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+REGIONS = ['Northern', 'Central', 'Southern']
+COLUMNS = ['Date', 'Region', 'Company', 'Port', 'Total throughput']
+
+def generate_monthly_volume(n_ports: int = 33, n_companies: int = 14, n_years: int = 6,
+                            start_year: int = 2020, seed: int = 0) -> pd.DataFrame:
+    """Deterministic frame with the 'Monthly container volume' sheet schema"""
+    if n_companies > n_ports:
+        raise ValueError('n_companies cannot exceed n_ports')
+    rng = np.random.default_rng(seed)
+    months = pd.date_range(f'{start_year}-01-01', periods=n_years * 12, freq='MS')
+
+    # Every company operates at least one port; ports keep one region for their lifetime
+    port_company = np.concatenate([np.arange(n_companies), rng.integers(0, n_companies, n_ports - n_companies)])
+    port_region = rng.integers(0, len(REGIONS), n_ports)
+    base = rng.lognormal(mean=10.5, sigma=1.0, size=n_ports)
+    growth = rng.normal(0.05, 0.04, size=n_ports)
+
+    # Port x month volumes: yearly trend, shared seasonality and per-cell noise
+    t = np.arange(len(months)) / 12
+    season = 1 + 0.08 * np.sin(2 * np.pi * (months.month.to_numpy() - 3) / 12)
+    volume = base[:, None] * (1 + growth[:, None]) ** t[None, :] * season[None, :]
+    volume *= rng.normal(1, 0.05, size=volume.shape).clip(0.5, 1.5)
+
+    n_months = len(months)
+    return pd.DataFrame({
+        'Date': np.tile(months.to_numpy(), n_ports),
+        'Region': np.repeat(np.array(REGIONS, dtype=object)[port_region], n_months),
+        'Company': np.repeat(np.array([f'C{i:03d}' for i in range(n_companies)], dtype=object)[port_company], n_months),
+        'Port': np.repeat(np.array([f'Port {i:04d}' for i in range(n_ports)], dtype=object), n_months),
+        'Total throughput': volume.round().ravel(),
+    }, columns=COLUMNS).sort_values('Date', kind='stable').reset_index(drop=True)
+
+def write_workbook(df: pd.DataFrame, path: str) -> None:
+    """Write the frame as a workbook readable by the dashboards' loaders"""
+    df.to_excel(path, sheet_name='Monthly container volume', index=False)
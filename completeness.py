@@ -0,0 +1,169 @@
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import ports_db
+from excel_stream import MONTHLY_VOLUME_SCHEMA
+from volume_cube import month_numbers, month_starts
+from workbook_cache import read_sheet
+
+STATUSES = ['missing', 'null', 'zero']
+LEVELS = {'company': ['Company'], 'port': ['Company', 'Port']}
+
+class CompletenessReport:
+    """Missing, null and zero months of every company and port over one month grid"""
+
+    # `issues` has one row per flagged series-month (level, Company, Port, Month, Status);
+    # `summary` has one row per series with its expected/present months and issue counts
+    def __init__(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp], span: str,
+                 issues: pd.DataFrame, summary: pd.DataFrame):
+        self.start = start
+        self.end = end
+        self.span = span
+        self.issues = issues
+        self.summary = summary
+
+    @property
+    def is_complete(self) -> bool:
+        return self.issues.empty
+
+    def counts(self) -> Dict[str, int]:
+        return {status: int((self.issues['Status'] == status).sum()) for status in STATUSES}
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form of the report"""
+        issues = self.issues.assign(Month=self.issues['Month'].dt.strftime('%Y-%m'))
+        return {
+            'start': self.start.strftime('%Y-%m') if self.start is not None else None,
+            'end': self.end.strftime('%Y-%m') if self.end is not None else None,
+            'span': self.span,
+            'counts': self.counts(),
+            'summary': self.summary.replace({np.nan: None}).to_dict(orient='records'),
+            'issues': issues.replace({np.nan: None}).to_dict(orient='records'),
+        }
+
+    def format(self) -> str:
+        """Plain-text report listing only the series with issues"""
+        if self.start is None:
+            return 'No data.'
+        lines = [f"Months {self.start.strftime('%B %Y')} - {self.end.strftime('%B %Y')} ({self.span} span)",
+                 ', '.join(f'{n} {status}' for status, n in self.counts().items())]
+        if self.is_complete:
+            lines.append('✓ Complete data - no missing, null or zero months')
+            return '\n'.join(lines)
+        for (level, company, port), rows in self.issues.groupby(['Level', 'Company', 'Port'], sort=False, dropna=False):
+            name = company if level == 'company' else f'{company} / {port}'
+            lines.append(f'\n{name}:')
+            for status, group in rows.groupby('Status', sort=False):
+                lines.append(f"  {status}: {', '.join(group['Month'].dt.strftime('%b %Y'))}")
+        return '\n'.join(lines)
+
+def check_completeness(df: pd.DataFrame, date_col: str = 'Date', value_col: str = 'Total throughput',
+                       start=None, end=None, span: str = 'global') -> CompletenessReport:
+    """Flag missing, null and zero months of every company and every (company, port) series"""
+    # span='global' expects every series on every month of the grid; span='series' only
+    # between each series' own first and last reported month
+    if span not in ('global', 'series'):
+        raise ValueError(f'Unknown span: {span}')
+    dates = pd.to_datetime(df[date_col], errors='coerce')
+    valid = dates.notna().to_numpy()
+    months = np.zeros(len(df), dtype=np.int64)
+    months[valid] = month_numbers(dates[valid])
+    values = pd.to_numeric(df[value_col], errors='coerce').to_numpy(dtype=float)
+    if not valid.any():
+        empty = pd.DataFrame(columns=['Level', 'Company', 'Port', 'Month', 'Status'])
+        return CompletenessReport(None, None, span, empty, pd.DataFrame())
+    first = int(months[valid].min()) if start is None else int(month_numbers(pd.Series([start]))[0])
+    last = int(months[valid].max()) if end is None else int(month_numbers(pd.Series([end]))[0])
+    grid = np.arange(first, last + 1)
+
+    base = pd.DataFrame({
+        'Company': df['Company'].astype(object).to_numpy(),
+        'Port': df['Port'].astype(object).to_numpy(),
+        'month': months,
+        'rows': 1,
+        'nulls': np.isnan(values).astype(int),
+        'value': values,
+    })[valid]
+
+    issues, summaries = [], []
+    for level, keys in LEVELS.items():
+        cells = base.groupby([*keys, 'month'], dropna=False).agg(
+            rows=('rows', 'sum'), nulls=('nulls', 'sum'), value=('value', 'sum'))
+        series = cells.index.droplevel('month').unique()
+        # The one reindex: every series against every month of the grid
+        full = pd.MultiIndex.from_arrays(
+            [*(np.repeat(series.get_level_values(i), len(grid)) for i in range(len(keys))),
+             np.tile(grid, len(series))], names=[*keys, 'month'])
+        table = cells.reindex(full)
+        rows = table['rows'].to_numpy()
+        status = np.select(
+            [np.isnan(rows), table['nulls'].to_numpy() > 0, table['value'].to_numpy() == 0],
+            ['missing', 'null', 'zero'], '')
+        expected = np.ones(len(table), dtype=bool)
+        if span == 'series':
+            present = ~np.isnan(rows).reshape(len(series), len(grid))
+            first_seen = present.argmax(axis=1)
+            last_seen = len(grid) - 1 - present[:, ::-1].argmax(axis=1)
+            position = np.arange(len(grid))
+            expected = ((position >= first_seen[:, None]) & (position <= last_seen[:, None])
+                        & present.any(axis=1)[:, None]).ravel()
+        flagged = (status != '') & expected
+        frame = table.index.to_frame(index=False)
+        if 'Port' not in frame:
+            frame['Port'] = np.nan
+        issues.append(pd.DataFrame({
+            'Level': level,
+            'Company': frame['Company'].to_numpy()[flagged],
+            'Port': frame['Port'].to_numpy()[flagged],
+            'Month': month_starts(frame['month'].to_numpy()[flagged]),
+            'Status': status[flagged],
+        }))
+        per_series = pd.DataFrame({
+            'expected': expected.reshape(len(series), len(grid)).sum(axis=1),
+            'present': (~np.isnan(rows) & expected).reshape(len(series), len(grid)).sum(axis=1),
+            **{s: ((status == s) & expected).reshape(len(series), len(grid)).sum(axis=1) for s in STATUSES},
+        })
+        ids = series.to_frame(index=False)
+        if 'Port' not in ids:
+            ids['Port'] = np.nan
+        summaries.append(pd.concat([pd.DataFrame({'Level': level}, index=ids.index), ids[['Company', 'Port']],
+                                    per_series], axis=1))
+    return CompletenessReport(month_starts([first])[0], month_starts([last])[0], span,
+                              pd.concat(issues, ignore_index=True), pd.concat(summaries, ignore_index=True))
+
+def from_ports_db(path: str = ports_db.DB_PATH, **kwargs) -> CompletenessReport:
+    """Completeness of the throughput table of a ports DB"""
+    df = ports_db.load_snapshot(path)
+    df = df.rename(columns={'company': 'Company', 'port': 'Port', 'date': 'Date', 'throughput': 'Total throughput'})
+    return check_completeness(df, **kwargs)
+
+def from_workbook(path: Optional[str] = None, **kwargs) -> CompletenessReport:
+    """Completeness of one workbook (default: the latest vintage), read through the sidecar cache"""
+    from vintages import SHEET, latest_workbook
+    df = read_sheet(path or latest_workbook(), sheet_name=SHEET, schema=MONTHLY_VOLUME_SCHEMA)
+    return check_completeness(df, **kwargs)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Report missing, null and zero months per company and port')
+    parser.add_argument('--source', choices=['workbook', 'db'], default='workbook')
+    parser.add_argument('--workbook', help='workbook path (default: the latest vintage in data/)')
+    parser.add_argument('--db', default=ports_db.DB_PATH)
+    parser.add_argument('--span', choices=['global', 'series'], default='global',
+                        help="'series' only checks months between a series' first and last report")
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args(argv)
+
+    if args.source == 'db':
+        report = from_ports_db(args.db, span=args.span)
+    else:
+        report = from_workbook(args.workbook, span=args.span)
+    print(json.dumps(report.to_dict(), indent=2, default=str) if args.json else report.format())
+    sys.exit(0 if report.is_complete else 1)
+
+if __name__ == '__main__':
+    main()
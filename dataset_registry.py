@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+import pandas as pd
+
+CACHE_MB_ENV = 'PORT_CHARTS_CACHE_MB'
+DEFAULT_CACHE_MB = 512
+
+def nbytes(value: Any) -> int:
+    """Approximate memory held by a cached frame, series, array or cube"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+class DatasetRegistry:
+    """Process-wide LRU of loaded datasets under a memory budget, shared by every session"""
+
+    # Values are handed out as-is, not copied, so callers must treat them as read-only;
+    # memory then grows with the number of distinct datasets rather than with viewers
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'DatasetRegistry':
+        """Registry with the ceiling from $PORT_CHARTS_CACHE_MB (default 512 MB)"""
+        return cls(int(float(os.environ.get(CACHE_MB_ENV, DEFAULT_CACHE_MB)) * 1024 * 1024))
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        """Shared value for `key`, calling `load` on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        # Sessions missing on the same key wait for one load instead of each building a copy
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+                self.misses += 1
+            try:
+                value = load()
+                self._store(key, value, nbytes(value))
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value
+
+    def _store(self, key: Hashable, value: Any, size: int) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._sizes[key] = size
+            # The newest entry always stays, even when it alone exceeds the ceiling
+            while len(self._entries) > 1 and sum(self._sizes.values()) > self.max_bytes:
+                old, _ = self._entries.popitem(last=False)
+                del self._sizes[old]
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'bytes': sum(self._sizes.values()),
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -1,47 +1,133 @@
 import sqlite3
-from typing import List, Dict, Optional, Tuple
+from typing import List, Optional, Tuple
 import pandas as pd
 
+import db_pool
+import table_snapshots
+from excel_stream import iter_sheet_chunks
+
 DB_PATH = 'monthly_income.db'
+# Worker type as shown in the app -> monthly_income column
+WORKER_TYPES = {'Urban': 'urban', 'Rural': 'rural', 'Nationwide': 'nationwide'}
+_INSERT_SQL = '''
+INSERT OR REPLACE INTO monthly_income (quarter, quarter_dt, urban, rural, nationwide)
+VALUES (?, ?, ?, ?, ?)
+'''
 
 def get_connection(path: str = DB_PATH) -> sqlite3.Connection:
-    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES|sqlite3.PARSE_COLNAMES)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # Standalone connection owned by the caller; module functions use the shared pool
+    return db_pool.connect(path)
 
 def init_db(path: str = DB_PATH) -> None:
-    conn = get_connection(path)
-    cur = conn.cursor()
-    cur.execute('''
-    CREATE TABLE IF NOT EXISTS monthly_income (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        quarter TEXT NOT NULL UNIQUE,
-        quarter_dt DATE,
-        urban REAL,
-        rural REAL,
-        nationwide REAL
+    if db_pool.is_initialized(path, 'monthly_income'):
+        return
+    with db_pool.transaction(path, data=True) as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_income (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quarter TEXT NOT NULL UNIQUE,
+            quarter_dt DATE,
+            urban REAL,
+            rural REAL,
+            nationwide REAL
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_monthly_income_quarter_dt ON monthly_income (quarter_dt)')
+        # QoQ and YoY growth (%) of every worker type, kept in step with monthly_income by
+        # every insert so pages only slice it
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_income_growth (
+            worker_type TEXT NOT NULL,
+            quarter_dt DATE NOT NULL,
+            qoq REAL,
+            yoy REAL,
+            PRIMARY KEY (worker_type, quarter_dt)
+        )
+        ''')
+        # Databases created before the growth table existed are backfilled once
+        if (conn.execute('SELECT 1 FROM monthly_income LIMIT 1').fetchone()
+                and not conn.execute('SELECT 1 FROM monthly_income_growth LIMIT 1').fetchone()):
+            _refresh_growth(conn)
+    db_pool.mark_initialized(path, 'monthly_income')
+
+def _refresh_growth(conn: sqlite3.Connection, since: Optional[str] = None) -> None:
+    # Growth rows from `since` on are recomputed; earlier quarters do not look at later ones.
+    # Like pct_change, the lags count rows in quarter order, 1 back for QoQ and 4 for YoY
+    where = '' if since is None else 'WHERE quarter_dt >= ?'
+    params = () if since is None else (since,)
+    conn.execute(f'DELETE FROM monthly_income_growth {where}', params)
+    lags = ', '.join(f'LAG({col}, 1) OVER w AS {col}_1, LAG({col}, 4) OVER w AS {col}_4' for col in WORKER_TYPES.values())
+    selects = ' UNION ALL '.join(
+        f"SELECT '{name}', quarter_dt, ({col} - {col}_1) * 100.0 / {col}_1, ({col} - {col}_4) * 100.0 / {col}_4 "
+        f'FROM ordered {where}' for name, col in WORKER_TYPES.items())
+    conn.execute(f'''
+    INSERT OR REPLACE INTO monthly_income_growth (worker_type, quarter_dt, qoq, yoy)
+    WITH ordered AS (
+        SELECT quarter_dt, {', '.join(WORKER_TYPES.values())}, {lags}
+        FROM monthly_income WHERE quarter_dt IS NOT NULL
+        WINDOW w AS (ORDER BY quarter_dt)
     )
-    ''')
-    conn.commit()
-    conn.close()
+    {selects}
+    ''', params * len(WORKER_TYPES))
 
 def insert_row(quarter: str, quarter_dt: Optional[str], urban: Optional[float], rural: Optional[float], nationwide: Optional[float], path: str = DB_PATH) -> None:
-    conn = get_connection(path)
-    cur = conn.cursor()
-    cur.execute('''
-    INSERT OR REPLACE INTO monthly_income (quarter, quarter_dt, urban, rural, nationwide)
-    VALUES (?, ?, ?, ?, ?)
-    ''', (quarter, quarter_dt, urban, rural, nationwide))
-    conn.commit()
-    conn.close()
+    with db_pool.transaction(path, data=True) as conn:
+        old = conn.execute('SELECT quarter_dt FROM monthly_income WHERE quarter = ?', (quarter,)).fetchone()
+        conn.execute(_INSERT_SQL, (quarter, quarter_dt, urban, rural, nationwide))
+        dates = [quarter_dt]
+        if old is not None:
+            # A replaced row may also have moved from an earlier quarter date
+            dates.append(None if old[0] is None else str(old[0]))
+        _refresh_growth(conn, None if None in dates else min(dates))
+
+def _quarter_bounds(start=None, end=None) -> Tuple[Optional[str], Optional[str]]:
+    # Quarters as '2015Q1', Periods or any date inside the quarter, inclusive at both ends
+    first = pd.Period(start, 'Q').start_time.strftime('%Y-%m-%d') if start is not None else None
+    last = pd.Period(end, 'Q').end_time.strftime('%Y-%m-%d') if end is not None else None
+    return first, last
+
+def _quarter_clause(start, end) -> Tuple[str, list]:
+    first, last = _quarter_bounds(start, end)
+    clauses, params = ['quarter_dt IS NOT NULL'], []
+    if first is not None:
+        clauses.append('quarter_dt >= ?')
+        params.append(first)
+    if last is not None:
+        clauses.append('quarter_dt <= ?')
+        params.append(last)
+    return ' AND '.join(clauses), params
+
+def query_quarters(start=None, end=None, path: str = DB_PATH) -> pd.DataFrame:
+    """Urban, Rural and Nationwide income of the quarters in an inclusive range, indexed by Quarter"""
+    where, params = _quarter_clause(start, end)
+    with db_pool.connection(path) as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(f'SELECT quarter_dt, urban, rural, nationwide FROM monthly_income WHERE {where} '
+                              'ORDER BY quarter_dt', params).fetchall()
+    df = pd.DataFrame(rows, columns=['Quarter', *WORKER_TYPES])
+    return df.set_index(pd.DatetimeIndex(pd.to_datetime(df.pop('Quarter')), name='Quarter'))
+
+def query_growth(worker_type: str, start=None, end=None, path: str = DB_PATH) -> pd.DataFrame:
+    """Stored QoQ and YoY growth (%) of one worker type over an inclusive quarter range, indexed by Quarter"""
+    if worker_type not in WORKER_TYPES:
+        raise ValueError(f'Unknown worker type: {worker_type}')
+    where, params = _quarter_clause(start, end)
+    with db_pool.connection(path) as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(f'SELECT quarter_dt, qoq, yoy FROM monthly_income_growth WHERE worker_type = ? AND {where} '
+                              'ORDER BY quarter_dt', [worker_type, *params]).fetchall()
+    df = pd.DataFrame(rows, columns=['Quarter', 'QoQ', 'YoY'])
+    return df.set_index(pd.DatetimeIndex(pd.to_datetime(df.pop('Quarter')), name='Quarter'))
+
+def data_version(path: str = DB_PATH) -> int:
+    """Current version of the income data; it only changes when a write commits"""
+    return db_pool.data_version(path)
 
 def fetch_all(path: str = DB_PATH) -> List[sqlite3.Row]:
-    conn = get_connection(path)
-    cur = conn.cursor()
-    cur.execute('SELECT * FROM monthly_income ORDER BY quarter_dt')
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with db_pool.connection(path) as conn:
+        return conn.execute('SELECT * FROM monthly_income ORDER BY quarter_dt').fetchall()
 
 def to_dataframe(path: str = DB_PATH) -> pd.DataFrame:
     rows = fetch_all(path)
@@ -54,19 +140,40 @@ def to_dataframe(path: str = DB_PATH) -> pd.DataFrame:
     df = df.rename(columns={'quarter_dt':'Quarter','urban':'Urban','rural':'Rural','nationwide':'Nationwide','quarter':'QuarterLabel'})
     return df[['Quarter','Urban','Rural','Nationwide']]
 
+def export_snapshot(path: str = DB_PATH, snapshot_dir: Optional[str] = None) -> str:
+    """Write the monthly_income table to an Arrow IPC snapshot of its current data version"""
+    with db_pool.read_snapshot(path):
+        version = data_version(path)
+        rows = fetch_all(path)
+    columns = ['id', 'quarter', 'quarter_dt', 'urban', 'rural', 'nationwide']
+    df = pd.DataFrame([tuple(r) for r in rows], columns=columns)
+    df['quarter_dt'] = pd.to_datetime(df['quarter_dt'])
+    return table_snapshots.export(df, path, 'monthly_income', version, snapshot_dir)
+
+def load_snapshot(path: str = DB_PATH, snapshot_dir: Optional[str] = None) -> pd.DataFrame:
+    """monthly_income rows memory-mapped from the snapshot of the current data version"""
+    df = table_snapshots.load(path, 'monthly_income', data_version(path), snapshot_dir)
+    if df is not None:
+        return df
+    try:
+        return table_snapshots.read(export_snapshot(path, snapshot_dir))
+    except FileNotFoundError:
+        # A write committed and a newer snapshot replaced this one before it was mapped
+        return load_snapshot(path, snapshot_dir)
+
 def import_excel_to_db(excel_path: str, path: str = DB_PATH, header=None, skiprows=4):
-    # Read the same way the app previously read
-    df = pd.read_excel(excel_path, header=header, skiprows=skiprows)
-    # drop first empty column if present
-    if df.shape[1] > 3:
-        df = df.iloc[:, 1:]
-    df.columns = ['Quarter', 'Urban', 'Rural', 'Nationwide']
-    # convert Quarter to date string
-    df['Quarter'] = pd.to_datetime(df['Quarter'])
+    # Read the same way the app previously read, streamed in read-only chunks
+    chunks = iter_sheet_chunks(excel_path, 0, skiprows=skiprows + (header or 0), header=header is not None)
     init_db(path)
-    for _, row in df.iterrows():
-        insert_row(str(row['Quarter'].strftime('%Y-%m-%d')), row['Quarter'].strftime('%Y-%m-%d'),
-                   float(row['Urban']) if pd.notna(row['Urban']) else None,
-                   float(row['Rural']) if pd.notna(row['Rural']) else None,
-                   float(row['Nationwide']) if pd.notna(row['Nationwide']) else None,
-                   path)
+    with db_pool.transaction(path, data=True) as conn:
+        for df in chunks:
+            # drop first empty column if present
+            if df.shape[1] > 3:
+                df = df.iloc[:, 1:]
+            df.columns = ['Quarter', 'Urban', 'Rural', 'Nationwide']
+            # convert Quarter to date string
+            dates = pd.to_datetime(df['Quarter']).dt.strftime('%Y-%m-%d').tolist()
+            values = [df[c].astype(float).astype(object).where(df[c].notna(), None).tolist() for c in WORKER_TYPES]
+            conn.executemany(_INSERT_SQL, zip(dates, dates, *values))
+        # Growth is recomputed once for the whole import rather than per row
+        _refresh_growth(conn)
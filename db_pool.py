@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Set, Tuple
+
+POOL_SIZE = 4
+
+_lock = threading.Lock()
+_pools: Dict[str, List[sqlite3.Connection]] = {}
+_initialized: Set[Tuple[str, str]] = set()
+_local = threading.local()
+
+def _key(path: str) -> str:
+    return path if path == ':memory:' else os.path.abspath(path)
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open a new standalone connection configured like the pooled ones"""
+    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                           check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    if path != ':memory:':
+        # WAL lets readers keep their snapshot while an import holds the write lock;
+        # NORMAL sync is durable across application crashes in WAL mode
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+def _held() -> Dict[str, sqlite3.Connection]:
+    held = getattr(_local, 'held', None)
+    if held is None:
+        held = _local.held = {}
+    return held
+
+def _snapshots() -> Set[str]:
+    snapshots = getattr(_local, 'snapshots', None)
+    if snapshots is None:
+        snapshots = _local.snapshots = set()
+    return snapshots
+
+def _dirty() -> Set[str]:
+    # Keys whose open transaction changed data rows in a transaction(data=True) block
+    dirty = getattr(_local, 'dirty', None)
+    if dirty is None:
+        dirty = _local.dirty = set()
+    return dirty
+
+def _acquire(key: str) -> sqlite3.Connection:
+    with _lock:
+        idle = _pools.setdefault(key, [])
+        if idle:
+            return idle.pop()
+    conn = connect(key)
+    # Transactions are managed explicitly by transaction()
+    conn.isolation_level = None
+    return conn
+
+def _release(key: str, conn: sqlite3.Connection) -> None:
+    if conn.in_transaction:
+        conn.execute('ROLLBACK')
+    with _lock:
+        idle = _pools.setdefault(key, [])
+        if len(idle) < POOL_SIZE:
+            idle.append(conn)
+            return
+    conn.close()
+
+@contextmanager
+def connection(path: str) -> Iterator[sqlite3.Connection]:
+    """Borrow a warm pooled connection; nested calls in one thread share it"""
+    key = _key(path)
+    held = _held()
+    if key in held:
+        yield held[key]
+        return
+    conn = _acquire(key)
+    held[key] = conn
+    try:
+        yield conn
+    finally:
+        del held[key]
+        _release(key, conn)
+
+@contextmanager
+def transaction(path: str, data: bool = False) -> Iterator[sqlite3.Connection]:
+    """Run the block in one write transaction, committed on success and rolled back on error"""
+    # data=True marks writers of the data tables: if such a block changed rows, the
+    # outermost transaction bumps data_version before committing. Bookkeeping writes
+    # (job status, ledgers, schema setup) leave the version and every cache keyed on it alone
+    key = _key(path)
+    with connection(path) as conn:
+        if key in _snapshots():
+            raise RuntimeError('Cannot write inside read_snapshot()')
+        changes = conn.total_changes
+        if conn.in_transaction:
+            # Join the enclosing transaction
+            yield conn
+            if data and conn.total_changes != changes:
+                _dirty().add(key)
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            if key in _dirty() or (data and conn.total_changes != changes):
+                _bump_data_version(conn)
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            _dirty().discard(key)
+        conn.execute('COMMIT')
+
+def _bump_data_version(conn: sqlite3.Connection) -> None:
+    # Single-row counter committed together with the writes it stamps
+    conn.execute('CREATE TABLE IF NOT EXISTS data_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)')
+    conn.execute('INSERT INTO data_version (id, version) VALUES (1, 1) ON CONFLICT (id) DO UPDATE SET version = version + 1')
+
+def data_version(path: str) -> int:
+    """Counter bumped by every committed transaction(data=True) that changed rows; caches key on it"""
+    with connection(path) as conn:
+        try:
+            row = conn.execute('SELECT version FROM data_version WHERE id = 1').fetchone()
+        except sqlite3.OperationalError:
+            # No data written through transaction() yet
+            return 0
+    return row[0] if row is not None else 0
+
+@contextmanager
+def read_snapshot(path: str) -> Iterator[sqlite3.Connection]:
+    """Run every read in the block against one consistent snapshot of the database"""
+    # Module functions called inside the block share this connection, so several queries
+    # see the same data even if an import commits in between
+    with connection(path) as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN')
+        key = _key(path)
+        snapshots = _snapshots()
+        snapshots.add(key)
+        try:
+            # A deferred transaction takes its snapshot at the first read
+            conn.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchall()
+            yield conn
+        finally:
+            snapshots.discard(key)
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+
+def is_initialized(path: str, name: str) -> bool:
+    """Whether schema `name` has already been set up for `path` in this process"""
+    with _lock:
+        return (_key(path), name) in _initialized
+
+def mark_initialized(path: str, name: str) -> None:
+    with _lock:
+        _initialized.add((_key(path), name))
+
+def close_all() -> None:
+    """Close every idle pooled connection"""
+    with _lock:
+        conns = [c for idle in _pools.values() for c in idle]
+        _pools.clear()
+        _initialized.clear()
+    for conn in conns:
+        conn.close()
@@ -0,0 +1,44 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the `n_out` points Largest-Triangle-Three-Buckets keeps, first and last included"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Interior points split into n_out - 2 buckets; one point is kept per bucket
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Third triangle vertex: mean of the next bucket (or the last point)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def downsample(series: pd.Series, max_points: Optional[int]) -> pd.Series:
+    """Shape-preserving subset of at most `max_points` non-null points, in original order"""
+    # Datetime and numeric indexes are used as x; anything else is treated as evenly spaced.
+    # Without a budget the series is returned unchanged, gaps included
+    if not max_points:
+        return series
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    index = series.index
+    if isinstance(index, pd.DatetimeIndex):
+        x = index.asi8.astype(float)
+    elif pd.api.types.is_numeric_dtype(index):
+        x = index.to_numpy(dtype=float)
+    else:
+        x = np.arange(len(series), dtype=float)
+    return series.iloc[lttb_indices(x, series.to_numpy(dtype=float), max_points)]
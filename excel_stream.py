@@ -0,0 +1,83 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+CHUNK_SIZE = 5000
+
+# Column types of the 'Monthly container volume' sheet
+MONTHLY_VOLUME_SCHEMA = {
+    'Date': 'datetime',
+    'Region': 'string',
+    'Company': 'string',
+    'Port': 'string',
+    'Total throughput': 'float',
+}
+
+def _normalize(name) -> str:
+    return str(name).strip().lower()
+
+def _coerce(df: pd.DataFrame, dtypes: Optional[Dict[str, str]]) -> pd.DataFrame:
+    if not dtypes:
+        return df
+    for col, kind in dtypes.items():
+        if col not in df.columns:
+            continue
+        if kind == 'datetime':
+            df[col] = pd.to_datetime(df[col], errors='coerce').astype('datetime64[ns]')
+        elif kind == 'float':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif kind == 'string':
+            df[col] = df[col].astype('string')
+    return df
+
+def iter_sheet_chunks(source, sheet_name=0, columns: Optional[Iterable[str]] = None,
+                      dtypes: Optional[Dict[str, str]] = None, chunk_size: int = CHUNK_SIZE,
+                      skiprows: int = 0, header: bool = True) -> Iterator[pd.DataFrame]:
+    """Stream a worksheet in read-only mode as typed DataFrame chunks of at most `chunk_size` rows"""
+    # `columns` are matched case- and whitespace-insensitively against the header and
+    # missing ones are skipped; without a header, columns are numbered from 0. Chunks are
+    # indexed by worksheet row number, which blank rows skipped here still count
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        rows = enumerate(ws.iter_rows(values_only=True), 1)
+        for _ in range(skiprows):
+            next(rows, None)
+        names: Optional[List] = None
+        if header:
+            first = next(rows, None)
+            if first is None:
+                return
+            names = [h if h is not None else f'Unnamed: {i}' for i, h in enumerate(first[1])]
+        indices: Optional[List[int]] = None
+        buffer, numbers = [], []
+        for number, row in rows:
+            if all(v is None for v in row):
+                continue
+            if names is None:
+                names = list(range(len(row)))
+            if indices is None:
+                if columns is None:
+                    indices = list(range(len(names)))
+                else:
+                    wanted = {_normalize(c) for c in columns}
+                    indices = [i for i, n in enumerate(names) if _normalize(n) in wanted]
+            buffer.append([row[i] if i < len(row) else None for i in indices])
+            numbers.append(number)
+            if len(buffer) >= chunk_size:
+                yield _coerce(pd.DataFrame(buffer, index=numbers, columns=[names[i] for i in indices]), dtypes)
+                buffer, numbers = [], []
+        if buffer:
+            yield _coerce(pd.DataFrame(buffer, index=numbers, columns=[names[i] for i in indices]), dtypes)
+    finally:
+        wb.close()
+
+def read_sheet_streaming(source, sheet_name=0, columns: Optional[Iterable[str]] = None,
+                         dtypes: Optional[Dict[str, str]] = None, chunk_size: int = CHUNK_SIZE,
+                         skiprows: int = 0, header: bool = True) -> pd.DataFrame:
+    """Whole sheet as one frame, built from streamed chunks of only the requested columns"""
+    chunks = list(iter_sheet_chunks(source, sheet_name, columns, dtypes, chunk_size, skiprows, header))
+    if not chunks:
+        return pd.DataFrame(columns=list(columns) if columns is not None else [])
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,329 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import db_pool
+import ports_db
+from excel_stream import CHUNK_SIZE, iter_sheet_chunks
+
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'uploads')
+REQUIRED_COLUMNS = ['region', 'company', 'port', 'total throughput']
+# Each row is dated either by a date column or by separate year and month columns
+DATE_COLUMNS = [['date'], ['year', 'month']]
+ERROR_COLUMNS = ['row', 'field', 'error']
+ACTIVE_STATUSES = ('queued', 'running')
+
+logger = logging.getLogger(__name__)
+
+# One worker thread per process runs jobs in submission order, since SQLite has a single writer
+_queue: 'queue.Queue' = queue.Queue()
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+# Live row counters of running jobs, kept in memory so progress polling never writes to the
+# job table; it gets the final counts when the job finishes
+_progress: Dict[int, Dict[str, int]] = {}
+
+def init_jobs(path: str = ports_db.DB_PATH) -> None:
+    if db_pool.is_initialized(path, 'import_jobs'):
+        return
+    with db_pool.transaction(path) as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            filename TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total_rows INTEGER,
+            processed_rows INTEGER NOT NULL DEFAULT 0,
+            imported_rows INTEGER NOT NULL DEFAULT 0,
+            error_count INTEGER NOT NULL DEFAULT 0,
+            message TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_job_errors (
+            job_id INTEGER NOT NULL REFERENCES import_jobs (id),
+            row INTEGER,
+            field TEXT,
+            error TEXT NOT NULL
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_import_job_errors_job ON import_job_errors (job_id)')
+        cols = [row[1] for row in conn.execute("PRAGMA table_info('import_jobs')")]
+        if 'sha256' not in cols:
+            conn.execute('ALTER TABLE import_jobs ADD COLUMN sha256 TEXT')
+        cols = [row[1] for row in conn.execute("PRAGMA table_info('import_job_errors')")]
+        if 'field' not in cols:
+            conn.execute('ALTER TABLE import_job_errors ADD COLUMN field TEXT')
+        # One row per distinct file content successfully imported
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_ledger (
+            sha256 TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            row_count INTEGER NOT NULL,
+            job_id INTEGER REFERENCES import_jobs (id),
+            imported_at TEXT NOT NULL
+        )
+        ''')
+        # Jobs left running by a process that exited can never finish
+        conn.execute("UPDATE import_jobs SET status = 'failed', message = 'Interrupted' WHERE status IN ('queued', 'running')")
+    db_pool.mark_initialized(path, 'import_jobs')
+
+def _now() -> str:
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def ledger_entry(sha256: str, path: str = ports_db.DB_PATH) -> Optional[Dict]:
+    """Ledger row of a previously imported file content, if any"""
+    init_jobs(path)
+    with db_pool.connection(path) as conn:
+        row = conn.execute('SELECT * FROM import_ledger WHERE sha256 = ?', (sha256,)).fetchone()
+    return dict(row) if row is not None else None
+
+def submit(data: bytes, filename: str, path: str = ports_db.DB_PATH, force: bool = False) -> Optional[int]:
+    """Queue an uploaded file for import and return its job id without waiting"""
+    # Content already in the ledger is skipped (None) unless `force`; content already
+    # queued or running returns that job instead of importing it twice
+    init_jobs(path)
+    ports_db.init_db(path)
+    sha256 = content_hash(data)
+    with db_pool.transaction(path) as conn:
+        active = conn.execute("SELECT id FROM import_jobs WHERE sha256 = ? AND status IN ('queued', 'running')",
+                              (sha256,)).fetchone()
+        if active is not None:
+            return active[0]
+        if not force and conn.execute('SELECT 1 FROM import_ledger WHERE sha256 = ?', (sha256,)).fetchone():
+            return None
+        job_id = conn.execute("INSERT INTO import_jobs (filename, status, created_at, sha256) VALUES (?, 'queued', ?, ?)",
+                              (filename, _now(), sha256)).lastrowid
+    # Spool to disk so the worker does not depend on the session's upload buffer
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    spool = os.path.join(UPLOAD_DIR, f'{job_id}-{os.path.basename(filename)}')
+    with open(spool, 'wb') as f:
+        f.write(data)
+    _progress[job_id] = {'processed_rows': 0, 'imported_rows': 0, 'error_count': 0}
+    _queue.put((job_id, spool, path))
+    _ensure_worker()
+    return job_id
+
+def _ensure_worker() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, name='import-jobs', daemon=True)
+            _worker.start()
+
+def _run_worker() -> None:
+    while True:
+        job_id, spool, path = _queue.get()
+        try:
+            run_job(job_id, spool, path)
+        except Exception as e:
+            # run_job only handles errors of the import itself; anything else (a locked DB
+            # while updating status, say) fails this job and the worker moves on
+            logger.exception('Import job %s failed', job_id)
+            _fail_job(job_id, spool, path, str(e))
+        finally:
+            _queue.task_done()
+
+def _fail_job(job_id: int, spool: str, path: str, message: str) -> None:
+    # Counts of the chunks that committed before the failure
+    progress = _progress.pop(job_id, None) or {'processed_rows': 0, 'imported_rows': 0, 'error_count': 0}
+    if os.path.exists(spool):
+        os.remove(spool)
+    try:
+        with db_pool.transaction(path) as conn:
+            conn.execute("UPDATE import_jobs SET status = 'failed', message = ?, processed_rows = ?, imported_rows = ?, "
+                         'error_count = ?, finished_at = ? WHERE id = ?',
+                         (message, progress['processed_rows'], progress['imported_rows'], progress['error_count'],
+                          _now(), job_id))
+    except Exception:
+        logger.exception('Could not mark import job %s as failed', job_id)
+
+def _count_rows(spool: str) -> Optional[int]:
+    # Cheap upper bound for the progress bar: line count or the sheet's recorded dimension
+    try:
+        if spool.lower().endswith('.csv'):
+            with open(spool, 'rb') as f:
+                return max(sum(1 for _ in f) - 1, 0)
+        wb = load_workbook(spool, read_only=True)
+        try:
+            rows = wb.worksheets[0].max_row
+        finally:
+            wb.close()
+        return max(rows - 1, 0) if rows else None
+    except Exception:
+        return None
+
+def _read_chunks(spool: str) -> Iterator[pd.DataFrame]:
+    # Chunks are indexed by their row number in the file, as a spreadsheet shows it
+    if not spool.lower().endswith('.csv'):
+        yield from iter_sheet_chunks(spool)
+        return
+    # Blank lines are read as empty rows and then dropped, so they still count towards the numbers
+    for chunk in pd.read_csv(spool, chunksize=CHUNK_SIZE, skip_blank_lines=False):
+        chunk.index = chunk.index + 2
+        yield chunk.dropna(how='all')
+
+def _missing_columns(columns) -> List[str]:
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if not any(all(c in columns for c in option) for option in DATE_COLUMNS):
+        missing.append(' or '.join('/'.join(option) for option in DATE_COLUMNS))
+    return missing
+
+def validate_chunk(u_df: pd.DataFrame,
+                   companies: Dict[Tuple[str, int, int], str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Valid rows of one chunk as a normalized frame plus a (row, field, error) table for the rest"""
+    # Every check runs over whole columns and errors report the chunk's index as row numbers.
+    # `companies` maps (port, year, month) -> company of the file's rows validated so far and
+    # is extended with this chunk, so later rows and chunks must agree with them
+    rows = u_df.index.to_numpy(dtype=np.int64)
+    u_df = u_df.reset_index(drop=True)
+    checks = []
+
+    port = u_df['port'].astype('string')
+    checks.append(('port', port.isna() | (port.str.strip() == ''), 'missing port'))
+    if 'date' in u_df.columns:
+        dates = pd.to_datetime(u_df['date'], errors='coerce')
+        checks.append(('date', u_df['date'].isna(), 'missing date'))
+        checks.append(('date', u_df['date'].notna() & dates.isna(), 'not a date'))
+        year, month = dates.dt.year, dates.dt.month
+    else:
+        year = pd.to_numeric(u_df['year'], errors='coerce')
+        month = pd.to_numeric(u_df['month'], errors='coerce')
+        checks.append(('year', year.isna() | (year % 1 != 0), 'year must be a whole number'))
+        checks.append(('month', ~month.isin(range(1, 13)), 'month must be 1-12'))
+    throughput = pd.to_numeric(u_df['total throughput'], errors='coerce')
+    checks.append(('total throughput', u_df['total throughput'].notna() & throughput.isna(), 'not a number'))
+    checks.append(('total throughput', throughput < 0, 'negative TEU'))
+
+    company = u_df['company'].astype('string')
+    ok = ~np.logical_or.reduce([mask.fillna(False).to_numpy(dtype=bool) for _, mask, _ in checks])
+    # A port's operator may change between months, so only rows for the same port and month
+    # must agree; the first valid one sets the company and the DB row for it is replaced
+    keyed = ok & company.notna().to_numpy()
+    keys = pd.MultiIndex.from_arrays([port[keyed].to_numpy(), year[keyed].to_numpy(dtype=np.int64),
+                                      month[keyed].to_numpy(dtype=np.int64)])
+    first_seen = ~keys.duplicated() & ~keys.isin(list(companies))
+    companies.update(zip(keys[first_seen], company[keyed][first_seen]))
+    expected = pd.Series(pd.NA, index=port.index, dtype='string')
+    expected[keyed] = pd.Series(keys.map(companies), dtype='string').to_numpy()
+    conflict = company.notna() & expected.notna() & (company != expected)
+    checks.append(('company', conflict,
+                   'company ' + company.fillna('') + ' differs from ' + expected.fillna('') +
+                   ' given for this port and month'))
+
+    errors = []
+    for field, mask, error in checks:
+        mask = mask.fillna(False).to_numpy(dtype=bool)
+        if mask.any():
+            messages = error[mask].to_numpy(dtype=object) if isinstance(error, pd.Series) else error
+            errors.append(pd.DataFrame({'row': rows[mask], 'field': field, 'error': messages}))
+    errors = (pd.concat(errors, ignore_index=True).sort_values('row', kind='stable', ignore_index=True)
+              if errors else pd.DataFrame(columns=ERROR_COLUMNS))
+    valid = ~np.isin(rows, errors['row'].to_numpy(dtype=np.int64))
+    good = pd.DataFrame({
+        'port': port,
+        'region': u_df['region'].astype('string'),
+        'company': company,
+        'year': year,
+        'month': month,
+        'throughput': throughput,
+    })[valid]
+    return good.astype({'year': 'int64', 'month': 'int64'}), errors
+
+def run_job(job_id: int, spool: str, path: str = ports_db.DB_PATH) -> None:
+    """Import one spooled file, committing each chunk's data and error rows together"""
+    progress = _progress.setdefault(job_id, {'processed_rows': 0, 'imported_rows': 0, 'error_count': 0})
+    size = os.path.getsize(spool)
+    with db_pool.transaction(path) as conn:
+        conn.execute("UPDATE import_jobs SET status = 'running', started_at = ?, total_rows = ? WHERE id = ?",
+                     (_now(), _count_rows(spool), job_id))
+    status, message = 'done', None
+    try:
+        companies: Dict[Tuple[str, int, int], str] = {}
+        for u_df in _read_chunks(spool):
+            u_df.columns = [str(c).strip().lower() for c in u_df.columns]
+            missing = _missing_columns(u_df.columns)
+            if missing:
+                raise ValueError(f'Uploaded file must contain columns: {REQUIRED_COLUMNS} and a date. Missing: {missing}')
+            rows, errors = validate_chunk(u_df, companies)
+            # One write transaction per chunk, so uploads and single-row edits get the
+            # database between chunks instead of timing out behind a large import
+            with db_pool.transaction(path) as conn:
+                ports_db.insert_many(rows, path)
+                conn.executemany('INSERT INTO import_job_errors (job_id, row, field, error) VALUES (?, ?, ?, ?)',
+                                 zip([job_id] * len(errors), errors['row'].tolist(), errors['field'], errors['error']))
+            progress['processed_rows'] += len(u_df)
+            progress['imported_rows'] += len(rows)
+            # Skipped rows, however many checks each one failed
+            progress['error_count'] += len(u_df) - len(rows)
+    except Exception as e:
+        # Chunks committed so far stay; with no ledger entry the file can simply be imported
+        # again, and its rows replace themselves
+        status, message = 'failed', str(e)
+    finally:
+        if os.path.exists(spool):
+            os.remove(spool)
+    with db_pool.transaction(path) as conn:
+        if status == 'done':
+            conn.execute('''
+            INSERT OR REPLACE INTO import_ledger (sha256, filename, size, row_count, job_id, imported_at)
+            SELECT sha256, filename, ?, ?, id, ? FROM import_jobs WHERE id = ?
+            ''', (size, progress['imported_rows'], _now(), job_id))
+        conn.execute('''
+        UPDATE import_jobs SET status = ?, message = ?, processed_rows = ?, imported_rows = ?,
+            error_count = ?, finished_at = ?
+        WHERE id = ?
+        ''', (status, message, progress['processed_rows'], progress['imported_rows'],
+              progress['error_count'], _now(), job_id))
+    _progress.pop(job_id, None)
+
+def get_job(job_id: int, path: str = ports_db.DB_PATH) -> Optional[Dict]:
+    """Job row with live counters while it runs"""
+    init_jobs(path)
+    with db_pool.connection(path) as conn:
+        row = conn.execute('SELECT * FROM import_jobs WHERE id = ?', (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    if job['status'] in ACTIVE_STATUSES:
+        job.update(_progress.get(job_id, {}))
+    return job
+
+def recent_jobs(limit: int = 10, path: str = ports_db.DB_PATH) -> List[Dict]:
+    init_jobs(path)
+    with db_pool.connection(path) as conn:
+        ids = [r[0] for r in conn.execute('SELECT id FROM import_jobs ORDER BY id DESC LIMIT ?', (limit,))]
+    return [get_job(job_id, path) for job_id in ids]
+
+def job_errors(job_id: int, path: str = ports_db.DB_PATH) -> pd.DataFrame:
+    """Row-level errors of a finished job, for the downloadable report"""
+    init_jobs(path)
+    with db_pool.connection(path) as conn:
+        rows = conn.execute('SELECT row, field, error FROM import_job_errors WHERE job_id = ? ORDER BY row',
+                            (job_id,)).fetchall()
+    return pd.DataFrame([tuple(r) for r in rows], columns=ERROR_COLUMNS)
+
+def error_summary(job_id: int, path: str = ports_db.DB_PATH) -> pd.DataFrame:
+    """One line per distinct field and error of a job, with its row count and first row"""
+    init_jobs(path)
+    with db_pool.connection(path) as conn:
+        rows = conn.execute('''
+        SELECT field, error, COUNT(*), MIN(row) FROM import_job_errors WHERE job_id = ?
+        GROUP BY field, error ORDER BY COUNT(*) DESC
+        ''', (job_id,)).fetchall()
+    return pd.DataFrame([tuple(r) for r in rows], columns=['field', 'error', 'rows', 'first row'])
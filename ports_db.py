@@ -1,113 +1,291 @@
 import sqlite3
-from typing import List
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+import db_pool
+import table_snapshots
+from excel_stream import CHUNK_SIZE, iter_sheet_chunks
+
 DB_PATH = 'ports_throughput.db'
 
+# Column dtypes of the frames returned by query_throughput / to_dataframe; the dimension
+# columns are categoricals
+THROUGHPUT_SCHEMA = {
+    'port': 'category',
+    'region': 'category',
+    'company': 'category',
+    'year': 'int16',
+    'month': 'int8',
+    'throughput': 'float64',
+    'date': 'datetime64[ns]',
+}
+
+# Columns read from uploaded sheets (matched case-insensitively)
+IMPORT_COLUMNS = ['date', 'year', 'month', 'port', 'region', 'company', 'total throughput', 'throughput']
+
 def get_connection(path: str = DB_PATH) -> sqlite3.Connection:
-    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES|sqlite3.PARSE_COLNAMES)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # Standalone connection owned by the caller; module functions use the shared pool
+    return db_pool.connect(path)
 
 def init_db(path: str = DB_PATH) -> None:
-    conn = get_connection(path)
-    cur = conn.cursor()
-    cur.execute('''
-    CREATE TABLE IF NOT EXISTS throughput (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-    port TEXT NOT NULL,
-    region TEXT,
-    company TEXT,
-    year INTEGER NOT NULL,
-    month INTEGER NOT NULL,
-    throughput REAL,
-    UNIQUE(port, year, month)
-    )
-    ''')
-    conn.commit()
-    # Ensure columns 'region' and 'company' exist (handle older DBs)
-    cur.execute("PRAGMA table_info('throughput')")
-    cols = [row[1] for row in cur.fetchall()]
-    if 'region' not in cols:
-        cur.execute("ALTER TABLE throughput ADD COLUMN region TEXT")
-    if 'company' not in cols:
-        cur.execute("ALTER TABLE throughput ADD COLUMN company TEXT")
-    conn.commit()
-    conn.close()
+    if db_pool.is_initialized(path, 'throughput'):
+        return
+    with db_pool.transaction(path) as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS throughput (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+        port TEXT NOT NULL,
+        region TEXT,
+        company TEXT,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        throughput REAL,
+        UNIQUE(port, year, month)
+        )
+        ''')
+        # Ensure columns 'region' and 'company' exist (handle older DBs)
+        cols = [row[1] for row in conn.execute("PRAGMA table_info('throughput')")]
+        if 'region' not in cols:
+            conn.execute("ALTER TABLE throughput ADD COLUMN region TEXT")
+        if 'company' not in cols:
+            conn.execute("ALTER TABLE throughput ADD COLUMN company TEXT")
+        # Indexes backing the filtered reads in query_throughput
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_throughput_company_ym ON throughput (company, year, month)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_throughput_region_ym ON throughput (region, year, month)')
+        # One row per observation per workbook vintage ('YYYY-MM'), kept for revision tracking
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS throughput_vintage (
+            vintage TEXT NOT NULL,
+            port TEXT NOT NULL,
+            region TEXT,
+            company TEXT,
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            date TEXT,
+            throughput REAL,
+            UNIQUE(vintage, port, year, month)
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_throughput_vintage_key ON throughput_vintage (port, year, month, vintage)')
+        # Latest value of every observation across all stored vintages
+        conn.execute('''
+        CREATE VIEW IF NOT EXISTS throughput_latest AS
+        SELECT v.* FROM throughput_vintage v
+        WHERE v.vintage = (
+            SELECT MAX(w.vintage) FROM throughput_vintage w
+            WHERE w.port = v.port AND w.year = v.year AND w.month = v.month
+        )
+        ''')
+    db_pool.mark_initialized(path, 'throughput')
 
 def insert_throughput(port: str, year: int, month: int, throughput: float, region: str = None, company: str = None, path: str = DB_PATH) -> None:
-    conn = get_connection(path)
-    cur = conn.cursor()
-    cur.execute('''
-    INSERT OR REPLACE INTO throughput (port, region, company, year, month, throughput)
-    VALUES (?, ?, ?, ?, ?, ?)
-    ''', (port, region, company, year, month, throughput))
-    conn.commit()
-    conn.close()
+    with db_pool.transaction(path, data=True) as conn:
+        conn.execute('''
+        INSERT OR REPLACE INTO throughput (port, region, company, year, month, throughput)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (port, region, company, year, month, throughput))
 
 def fetch_all(path: str = DB_PATH) -> List[sqlite3.Row]:
-    conn = get_connection(path)
-    cur = conn.cursor()
-    cur.execute('SELECT * FROM throughput ORDER BY year, month')
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with db_pool.connection(path) as conn:
+        return conn.execute('SELECT * FROM throughput ORDER BY year, month').fetchall()
+
+def _month_key(value) -> Tuple[int, int]:
+    # Accept (year, month) tuples or anything pd.Timestamp understands
+    if isinstance(value, tuple):
+        return int(value[0]), int(value[1])
+    ts = pd.Timestamp(value)
+    return ts.year, ts.month
+
+def query_throughput(companies: Optional[Iterable[str]] = None, ports: Optional[Iterable[str]] = None,
+                     regions: Optional[Iterable[str]] = None, start=None, end=None,
+                     path: str = DB_PATH) -> pd.DataFrame:
+    """Read only the throughput rows matching the given dimensions and inclusive month range"""
+    clauses, params = [], []
+    for col, values in (('company', companies), ('port', ports), ('region', regions)):
+        if values is not None:
+            values = list(values)
+            clauses.append(f"{col} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if start is not None:
+        clauses.append('(year, month) >= (?, ?)')
+        params.extend(_month_key(start))
+    if end is not None:
+        clauses.append('(year, month) <= (?, ?)')
+        params.extend(_month_key(end))
+    sql = 'SELECT port, region, company, year, month, throughput FROM throughput'
+    if clauses:
+        sql += ' WHERE ' + ' AND '.join(clauses)
+    sql += ' ORDER BY year, month'
+    with db_pool.connection(path) as conn:
+        # Plain tuples instead of sqlite3.Row objects, transposed straight into typed columns
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(sql, params).fetchall()
+    return _rows_to_frame(rows)
+
+def data_version(path: str = DB_PATH) -> int:
+    """Version stamp of the data, bumped by every write; a single-row lookup"""
+    return db_pool.data_version(path)
+
+def distinct_values(column: str, path: str = DB_PATH) -> List[str]:
+    """Sorted distinct non-null values of a dimension column, for filter widgets"""
+    if column not in ('port', 'region', 'company'):
+        raise ValueError(f'Unknown dimension column: {column}')
+    with db_pool.connection(path) as conn:
+        rows = conn.execute(f'SELECT DISTINCT {column} FROM throughput WHERE {column} IS NOT NULL ORDER BY {column}').fetchall()
+    return [r[0] for r in rows]
+
+def _rows_to_frame(rows: List[tuple]) -> pd.DataFrame:
+    """Typed frame from (port, region, company, year, month, throughput) rows"""
+    port, region, company, year, month, throughput = zip(*rows) if rows else [()] * 6
+    year = np.asarray(year, dtype=THROUGHPUT_SCHEMA['year'])
+    month = np.asarray(month, dtype=THROUGHPUT_SCHEMA['month'])
+    return pd.DataFrame({
+        'port': pd.Categorical(port),
+        'region': pd.Categorical(region),
+        'company': pd.Categorical(company),
+        'year': year,
+        'month': month,
+        # NULL throughput arrives as None, which float64 turns into NaN
+        'throughput': np.asarray(throughput, dtype=object).astype(THROUGHPUT_SCHEMA['throughput']),
+        # Month start dates straight from the month number since the epoch, no string parsing
+        'date': ((year.astype(np.int64) - 1970) * 12 + month - 1).astype('datetime64[M]').astype(THROUGHPUT_SCHEMA['date']),
+    })
 
 def to_dataframe(path: str = DB_PATH) -> pd.DataFrame:
-    rows = fetch_all(path)
-    if not rows:
-        return pd.DataFrame(columns=['port','region','company','year','month','throughput','date'])
-
-    df = pd.DataFrame([dict(r) for r in rows])
-    # Ensure expected columns exist
-    for col in ['port', 'region', 'company', 'year', 'month', 'throughput']:
-        if col not in df.columns:
-            df[col] = None
-
-    # Coerce types where possible
-    df['year'] = pd.to_numeric(df['year'], errors='coerce')
-    df['month'] = pd.to_numeric(df['month'], errors='coerce')
-    df['throughput'] = pd.to_numeric(df['throughput'], errors='coerce')
-    # Create date column
-    df['date'] = pd.to_datetime(df['year'].astype('Int64').astype(str) + '-' + df['month'].astype('Int64').astype(str) + '-01', errors='coerce')
-    return df[['port','region','company','year','month','throughput','date']]
-
-def import_csv(path_csv: str, db_path: str = DB_PATH) -> None:
+    return query_throughput(path=path)
+
+def export_snapshot(path: str = DB_PATH, snapshot_dir: Optional[str] = None) -> str:
+    """Write the throughput table to an Arrow IPC snapshot named after its data version"""
+    # Version and rows are read from one snapshot, so the file never mixes two versions
+    with db_pool.read_snapshot(path):
+        version = data_version(path)
+        df = query_throughput(path=path)
+    return table_snapshots.export(df, path, 'throughput', version, snapshot_dir)
+
+def load_snapshot(path: str = DB_PATH, snapshot_dir: Optional[str] = None) -> pd.DataFrame:
+    """Throughput table (as query_throughput returns it) memory-mapped from its current snapshot"""
+    # The snapshot is exported on first use after every write
+    df = table_snapshots.load(path, 'throughput', data_version(path), snapshot_dir)
+    if df is not None:
+        return df
+    try:
+        return table_snapshots.read(export_snapshot(path, snapshot_dir))
+    except FileNotFoundError:
+        # A write committed and a newer snapshot replaced this one before it was mapped
+        return load_snapshot(path, snapshot_dir)
+
+def _normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert an imported frame into typed throughput rows in one vectorized pass"""
+    df = df.rename(columns=lambda c: str(c).strip().lower())
+    if 'date' in df.columns:
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        year = dates.dt.year
+        month = dates.dt.month
+    else:
+        year = pd.to_numeric(df.get('year'), errors='coerce')
+        month = pd.to_numeric(df.get('month'), errors='coerce')
+    value_col = 'total throughput' if 'total throughput' in df.columns else 'throughput'
+    out = pd.DataFrame({
+        'port': df['port'].astype('string'),
+        'region': df['region'].astype('string') if 'region' in df.columns else pd.NA,
+        'company': df['company'].astype('string') if 'company' in df.columns else pd.NA,
+        'year': year,
+        'month': month,
+        'throughput': pd.to_numeric(df[value_col], errors='coerce'),
+    }, index=df.index)
+    # Rows without a port or a usable year/month cannot be keyed, drop them
+    out = out.dropna(subset=['port', 'year', 'month'])
+    out['year'] = out['year'].astype('int64')
+    out['month'] = out['month'].astype('int64')
+    return out
+
+def insert_many(df: pd.DataFrame, path: str = DB_PATH) -> int:
+    """Write normalized throughput rows with a single executemany in one transaction"""
+    rows = list(zip(
+        df['port'].tolist(),
+        df['region'].astype(object).where(df['region'].notna(), None).tolist(),
+        df['company'].astype(object).where(df['company'].notna(), None).tolist(),
+        df['year'].tolist(),
+        df['month'].tolist(),
+        df['throughput'].astype(object).where(df['throughput'].notna(), None).tolist(),
+    ))
+    with db_pool.transaction(path, data=True) as conn:
+        conn.executemany('''
+        INSERT OR REPLACE INTO throughput (port, region, company, year, month, throughput)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return len(rows)
+
+def import_dataframe(df: pd.DataFrame, db_path: str = DB_PATH) -> int:
     # expects columns: date or year/month, port, total throughput, and optional region/company
-    df = pd.read_csv(path_csv)
-    init_db(db_path)
-    cols = [c.strip().lower() for c in df.columns]
-    df.columns = cols
-    for _, r in df.iterrows():
-        # parse year/month
-        if 'date' in df.columns:
-            date = pd.to_datetime(r['date'])
-            year = int(date.year)
-            month = int(date.month)
-        else:
-            year = int(r.get('year'))
-            month = int(r.get('month'))
-        port = str(r.get('port'))
-        throughput = float(r.get('total throughput') or r.get('throughput'))
-        region = str(r.get('region')) if 'region' in df.columns else None
-        company = str(r.get('company')) if 'company' in df.columns else None
-        insert_throughput(port, year, month, throughput, region=region, company=company, path=db_path)
-
-def import_excel(path_xlsx: str, db_path: str = DB_PATH, sheet_name=0) -> None:
-    df = pd.read_excel(path_xlsx, sheet_name=sheet_name)
+    return import_chunks([df], db_path)
+
+def import_chunks(chunks: Iterable[pd.DataFrame], db_path: str = DB_PATH) -> int:
+    """Normalize and insert frames one at a time, all inside a single transaction"""
     init_db(db_path)
-    cols = [c.strip().lower() for c in df.columns]
-    df.columns = cols
-    for _, r in df.iterrows():
-        if 'date' in df.columns:
-            date = pd.to_datetime(r['date'])
-            year = int(date.year)
-            month = int(date.month)
-        else:
-            year = int(r.get('year'))
-            month = int(r.get('month'))
-        port = str(r.get('port'))
-        throughput = float(r.get('total throughput') or r.get('throughput'))
-        region = str(r.get('region')) if 'region' in df.columns else None
-        company = str(r.get('company')) if 'company' in df.columns else None
-        insert_throughput(port, year, month, throughput, region=region, company=company, path=db_path)
+    count = 0
+    with db_pool.transaction(db_path, data=True):
+        for chunk in chunks:
+            count += insert_many(_normalize_frame(chunk), db_path)
+    return count
+
+def import_csv(path_csv: str, db_path: str = DB_PATH) -> int:
+    return import_chunks(pd.read_csv(path_csv, chunksize=CHUNK_SIZE), db_path)
+
+def import_excel(path_xlsx, db_path: str = DB_PATH, sheet_name=0) -> int:
+    # Streams only the importable columns, so memory stays flat as workbooks grow
+    return import_chunks(iter_sheet_chunks(path_xlsx, sheet_name, IMPORT_COLUMNS), db_path)
+
+def insert_vintage(df: pd.DataFrame, vintage: str, path: str = DB_PATH) -> int:
+    """Store one workbook vintage's Date/Region/Company/Port/Total throughput rows"""
+    init_db(path)
+    dates = pd.to_datetime(df['Date'], errors='coerce')
+    keep = dates.notna() & df['Port'].notna()
+    df, dates = df[keep], dates[keep]
+    values = pd.to_numeric(df['Total throughput'], errors='coerce')
+    rows = list(zip(
+        [vintage] * len(df),
+        df['Port'].astype(str).tolist(),
+        df['Region'].astype(object).where(df['Region'].notna(), None).tolist(),
+        df['Company'].astype(object).where(df['Company'].notna(), None).tolist(),
+        dates.dt.year.tolist(),
+        dates.dt.month.tolist(),
+        dates.dt.strftime('%Y-%m-%d').tolist(),
+        values.astype(object).where(values.notna(), None).tolist(),
+    ))
+    with db_pool.transaction(path, data=True) as conn:
+        # Re-ingesting a vintage replaces it wholesale
+        conn.execute('DELETE FROM throughput_vintage WHERE vintage = ?', (vintage,))
+        conn.executemany('''
+        INSERT INTO throughput_vintage (vintage, port, region, company, year, month, date, throughput)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    return len(rows)
+
+def stored_vintages(path: str = DB_PATH) -> List[str]:
+    init_db(path)
+    with db_pool.connection(path) as conn:
+        rows = conn.execute('SELECT DISTINCT vintage FROM throughput_vintage ORDER BY vintage').fetchall()
+    return [r[0] for r in rows]
+
+def fetch_vintages(vintages: Optional[Iterable[str]] = None, latest: bool = False,
+                   path: str = DB_PATH) -> pd.DataFrame:
+    """Stored observations in the workbook column layout plus a leading Vintage column"""
+    # With `latest`, read the throughput_latest view instead of every vintage
+    init_db(path)
+    sql = f"SELECT vintage, date, region, company, port, throughput FROM {'throughput_latest' if latest else 'throughput_vintage'}"
+    params: list = []
+    if vintages is not None:
+        vintages = list(vintages)
+        sql += f" WHERE vintage IN ({', '.join('?' * len(vintages))})"
+        params.extend(vintages)
+    sql += ' ORDER BY vintage, year, month, port'
+    with db_pool.connection(path) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    df = pd.DataFrame([tuple(r) for r in rows],
+                      columns=['Vintage', 'Date', 'Region', 'Company', 'Port', 'Total throughput'])
+    df['Date'] = pd.to_datetime(df['Date'])
+    df['Total throughput'] = pd.to_numeric(df['Total throughput'], errors='coerce')
+    return df
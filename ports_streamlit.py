@@ -1,68 +1,136 @@
 
 import streamlit as st
-import pandas as pd
-from ports_db import init_db, to_dataframe, insert_throughput
+from ports_db import DB_PATH, init_db, query_throughput, distinct_values, insert_throughput, data_version, load_snapshot
+import db_pool
+import import_jobs
+import stage_timer
 
 init_db()
 
 st.title('Port throughput admin')
 
-# Upload area for Excel/CSV to bulk import monthly datapoints
-st.subheader('Upload Excel / CSV to import monthly datapoints')
-uploaded_file = st.file_uploader('Choose an Excel (.xlsx) or CSV file', type=['xlsx', 'csv'])
-if uploaded_file is not None:
-    try:
-        if uploaded_file.name.lower().endswith('.csv'):
-            u_df = pd.read_csv(uploaded_file)
-        else:
-            u_df = pd.read_excel(uploaded_file)
+# Opt-in per-stage timing; results go to the sidebar panel and logs/stage_timings.jsonl
+timer = stage_timer.start_run('ports_streamlit', st.sidebar.checkbox('🛠 Performance debug panel', value=False))
+try:
+    # Upload area for Excel/CSV to bulk import monthly datapoints
+    st.subheader('Upload Excel / CSV to import monthly datapoints')
+    uploaded_file = st.file_uploader('Choose an Excel (.xlsx) or CSV file', type=['xlsx', 'csv'])
+    with timer.stage('upload_import'):
+        # The file stays in the uploader across reruns, so content already in the import
+        # ledger is skipped unless re-imported explicitly; new content is queued once, and
+        # again only on request if that job failed
+        if uploaded_file is not None:
+            data = uploaded_file.getvalue()
+            hashes = st.session_state.setdefault('upload_hashes', {})
+            if uploaded_file.file_id not in hashes:
+                hashes[uploaded_file.file_id] = import_jobs.content_hash(data)
+            digest = hashes[uploaded_file.file_id]
+            # Job this session queued for each content hash
+            upload_jobs = st.session_state.setdefault('upload_jobs', {})
+            job = import_jobs.get_job(upload_jobs[digest], DB_PATH) if upload_jobs.get(digest) is not None else None
+            entry = import_jobs.ledger_entry(digest, DB_PATH)
+            if entry is None:
+                if job is None:
+                    upload_jobs[digest] = import_jobs.submit(data, uploaded_file.name, DB_PATH)
+                elif job['status'] == 'failed' and st.button('Retry import'):
+                    upload_jobs[digest] = import_jobs.submit(data, uploaded_file.name, DB_PATH)
+            else:
+                if job is None:
+                    st.info(f"{uploaded_file.name} was already imported on {entry['imported_at']} "
+                            f"({entry['row_count']:,} rows); skipped.")
+                if st.button('Re-import'):
+                    upload_jobs[digest] = import_jobs.submit(data, uploaded_file.name, DB_PATH, force=True)
 
-        # Normalize column names
-        cols = [c.strip().lower() for c in u_df.columns]
-        u_df.columns = cols
+    # A finished job's errors never change, so the polling fragment reads them once per job
+    @st.cache_data(max_entries=16)
+    def cached_error_summary(job_id):
+        return import_jobs.error_summary(job_id, DB_PATH)
 
-        # Required columns: Date, Region, Company, Port, Total throughput
-        required = {'date', 'region', 'company', 'port', 'total throughput'}
-        if not required.issubset(set(cols)):
-            st.error(f'Uploaded file must contain columns: {required}. Found: {set(cols)}')
-        else:
-            count = 0
-            for _, r in u_df.iterrows():
-                try:
-                    date = pd.to_datetime(r['date'])
-                    year = int(date.year)
-                    month = int(date.month)
-                    region = str(r['region']) if pd.notna(r['region']) else None
-                    company = str(r['company']) if pd.notna(r['company']) else None
-                    port = str(r['port'])
-                    throughput = float(r['total throughput'])
-                    insert_throughput(port, year, month, throughput, region=region, company=company)
-                    count += 1
-                except Exception as e:
-                    # skip bad rows but show a warning
-                    st.warning(f'Skipped row due to error: {e}')
-            st.success(f'Imported {count} rows into the database.')
-    except Exception as e:
-        st.error(f'Failed to read uploaded file: {e}')
+    @st.cache_data(max_entries=16)
+    def cached_error_csv(job_id):
+        return import_jobs.job_errors(job_id, DB_PATH).to_csv(index=False)
 
+    def show_import_jobs():
+        """Progress of recent import jobs and their error reports"""
+        for job in import_jobs.recent_jobs(5, DB_PATH):
+            label = f"#{job['id']} {job['filename']}"
+            if job['status'] in import_jobs.ACTIVE_STATUSES:
+                total = job['total_rows'] or 0
+                done = min(job['processed_rows'] / total, 1.0) if total else 0.0
+                st.progress(done, text=f"{label}: {job['status']}, {job['processed_rows']:,} of ~{total:,} rows")
+            elif job['status'] == 'failed':
+                kept = f", {job['imported_rows']:,} rows imported before that" if job['imported_rows'] else ''
+                st.error(f"{label}: failed - {job['message']}{kept}")
+            else:
+                st.success(f"{label}: imported {job['imported_rows']:,} rows, {job['error_count']:,} skipped")
+                if job['error_count']:
+                    st.dataframe(cached_error_summary(job['id']), hide_index=True)
+                    st.download_button('Download error report', cached_error_csv(job['id']),
+                                       file_name=f"import-{job['id']}-errors.csv", mime='text/csv',
+                                       key=f"errors-{job['id']}")
 
-df = to_dataframe()
-st.write('Data preview:')
-st.dataframe(df)
+    st.subheader('Import jobs')
+    if hasattr(st, 'fragment'):
+        # Polls only this section while the rest of the page stays idle
+        st.fragment(run_every=2)(show_import_jobs)()
+    else:
+        st.button('Refresh import status')
+        show_import_jobs()
 
-st.subheader('Add / update monthly throughput (single row)')
-with st.form('add'):
-    port = st.text_input('Port')
-    year = st.number_input('Year', value=2025, min_value=2000, max_value=2100)
-    month = st.number_input('Month', value=1, min_value=1, max_value=12)
-    throughput = st.number_input('Throughput (TEU)', value=0.0, format='%.2f')
-    submitted = st.form_submit_button('Save')
-    if submitted:
-        if not port:
-            st.error('Port is required')
-        else:
-            insert_throughput(port, int(year), int(month), float(throughput))
-            st.success('Saved. Refresh to see changes.')
 
-st.markdown('---')
-st.info('You can also run ports_db_init.py or use import_csv/import_excel in the ports_db module programmatically.')
+    st.subheader('Data preview')
+
+    # Results are cached per data version, so reruns without a committed write never touch SQLite
+    @st.cache_data(max_entries=16)
+    def cached_distinct(version, column):
+        return distinct_values(column)
+
+    @st.cache_data(max_entries=64)
+    def cached_query(version, companies, ports, regions, start, end):
+        return query_throughput(companies=companies, ports=ports, regions=regions, start=start, end=end)
+
+    # Filters are pushed into the SQL query so only displayed rows are read
+    # Filter options and rows come from one snapshot, so a concurrent import never shows half-loaded
+    with db_pool.read_snapshot(DB_PATH):
+        version = data_version()
+        f_col1, f_col2, f_col3 = st.columns(3)
+        with f_col1:
+            f_companies = st.multiselect('Company', cached_distinct(version, 'company'))
+        with f_col2:
+            f_regions = st.multiselect('Region', cached_distinct(version, 'region'))
+        with f_col3:
+            f_ports = st.multiselect('Port', cached_distinct(version, 'port'))
+        f_start, f_end = st.columns(2)
+        with f_start:
+            start_month = st.date_input('From month', value=None)
+        with f_end:
+            end_month = st.date_input('To month', value=None)
+        with timer.stage('preview_query'):
+            if f_companies or f_regions or f_ports or start_month or end_month:
+                df = cached_query(version, f_companies or None, f_ports or None, f_regions or None, start_month, end_month)
+            else:
+                # The unfiltered table is memory-mapped from its snapshot rather than fetched row by row
+                df = load_snapshot()
+    with timer.stage('preview_render'):
+        st.write(f'{len(df)} rows')
+        st.dataframe(df)
+
+    st.subheader('Add / update monthly throughput (single row)')
+    with st.form('add'):
+        port = st.text_input('Port')
+        year = st.number_input('Year', value=2025, min_value=2000, max_value=2100)
+        month = st.number_input('Month', value=1, min_value=1, max_value=12)
+        throughput = st.number_input('Throughput (TEU)', value=0.0, format='%.2f')
+        submitted = st.form_submit_button('Save')
+        if submitted:
+            if not port:
+                st.error('Port is required')
+            else:
+                insert_throughput(port, int(year), int(month), float(throughput))
+                st.success('Saved. Refresh to see changes.')
+
+    st.markdown('---')
+    st.info('You can also run ports_db_init.py or use import_csv/import_excel in the ports_db module programmatically.')
+finally:
+    timer.finish()
+    stage_timer.render_panel(timer)
@@ -0,0 +1,94 @@
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from volume_cube import month_numbers, month_starts
+
+def _month_number(value) -> int:
+    # Months since year 0, so consecutive months differ by one
+    ts = pd.Timestamp(value)
+    return ts.year * 12 + ts.month - 1
+
+class PrefixSumIndex:
+    """Cumulative throughput over a dense company x month grid for constant-time range totals"""
+
+    def __init__(self, companies: List[str], first_month: int, cumulative: np.ndarray):
+        self.companies = list(companies)
+        self.first_month = first_month
+        # cumulative[c, j] is the total of company c over the first j months of the grid
+        self.cumulative = cumulative
+        self._rows = {company: i for i, company in enumerate(self.companies)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, date_col: str = 'Date', group_col: str = 'Company',
+                   value_col: str = 'Total throughput') -> 'PrefixSumIndex':
+        if df.empty:
+            return cls([], 0, np.zeros((0, 1)))
+        months = month_numbers(df[date_col])
+        first_month = int(months.min())
+        companies = sorted(df[group_col].dropna().unique())
+        grid = cls._grid(df[group_col], months, df[value_col], companies, first_month, int(months.max()) - first_month + 1)
+        cumulative = np.zeros((len(companies), grid.shape[1] + 1))
+        np.cumsum(grid, axis=1, out=cumulative[:, 1:])
+        return cls(companies, first_month, cumulative)
+
+    @staticmethod
+    def _grid(groups: pd.Series, months: np.ndarray, values: pd.Series, companies: List[str],
+              first_month: int, n_months: int) -> np.ndarray:
+        rows = pd.Categorical(groups, categories=companies).codes
+        keep = rows >= 0
+        grid = np.zeros((len(companies), n_months))
+        np.add.at(grid, (rows[keep], months[keep] - first_month),
+                  np.nan_to_num(pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)[keep]))
+        return grid
+
+    @property
+    def nbytes(self) -> int:
+        return self.cumulative.nbytes
+
+    @property
+    def n_months(self) -> int:
+        return self.cumulative.shape[1] - 1
+
+    @property
+    def last_month(self) -> int:
+        return self.first_month + self.n_months - 1
+
+    def month_start(self, month: int) -> pd.Timestamp:
+        return month_starts([month])[0]
+
+    def _bounds(self, start, end):
+        # Clamp the inclusive month range to the grid, as column offsets into `cumulative`
+        lo = 0 if start is None else min(max(_month_number(start) - self.first_month, 0), self.n_months)
+        hi = self.n_months if end is None else min(max(_month_number(end) - self.first_month + 1, 0), self.n_months)
+        return lo, max(lo, hi)
+
+    def totals(self, start=None, end=None, companies: Optional[Iterable[str]] = None) -> pd.Series:
+        """Per-company totals over the inclusive month range"""
+        lo, hi = self._bounds(start, end)
+        totals = pd.Series(self.cumulative[:, hi] - self.cumulative[:, lo], index=self.companies, name='Total throughput')
+        if companies is not None:
+            totals = totals[totals.index.isin(list(companies))]
+        return totals
+
+    def range_total(self, companies: Optional[Iterable[str]] = None, start=None, end=None) -> float:
+        """Total over a company set and inclusive month range from two prefix lookups per company"""
+        lo, hi = self._bounds(start, end)
+        if companies is None:
+            rows = slice(None)
+        else:
+            rows = [self._rows[c] for c in companies if c in self._rows]
+        return float(self.cumulative[rows, hi].sum() - self.cumulative[rows, lo].sum())
+
+    def same_period_last_year(self, companies: Optional[Iterable[str]] = None, start=None, end=None):
+        """Totals for the range and for the same months one year earlier, None if those are not all indexed"""
+        start = pd.Timestamp(start) if start is not None else self.month_start(self.first_month)
+        end = pd.Timestamp(end) if end is not None else self.month_start(self.last_month)
+        companies = None if companies is None else list(companies)
+        current = self.range_total(companies, start, end)
+        # A clamped earlier window would cover fewer months and overstate the growth
+        if _month_number(start - pd.DateOffset(years=1)) < self.first_month:
+            return current, None
+        previous = self.range_total(companies, start - pd.DateOffset(years=1), end - pd.DateOffset(years=1))
+        return current, previous
@@ -1,22 +1,11 @@
-<<<<<<< HEAD
-import pandas as pd
+import os
+import sys
 
-# Read the Excel file
-df = pd.read_excel('Monthly container volume -  Quarterly sales and NPATMI_Jul 2025.xlsx', 
-                   sheet_name='Monthly container volume')
-
-# Print detailed information about the DataFrame
-print("Data loaded successfully!")
-print("\nColumns:", df.columns.tolist())
-print("\nColumn names with exact formatting:")
-for col in df.columns:
-    print(f"'{col}'")
-print("\nFirst 5 rows:\n", df.head())
-=======
-import pandas as pd
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from workbook_cache import read_sheet
 
 # Read the Excel file
-df = pd.read_excel('Monthly container volume -  Quarterly sales and NPATMI_Jul 2025.xlsx', 
+df = read_sheet('Monthly container volume -  Quarterly sales and NPATMI_Jul 2025.xlsx', 
                    sheet_name='Monthly container volume')
 
 # Print detailed information about the DataFrame
@@ -26,4 +15,3 @@ print("\nColumn names with exact formatting:")
 for col in df.columns:
     print(f"'{col}'")
 print("\nFirst 5 rows:\n", df.head())
->>>>>>> d4a3375b61336330aa3631cc2ff60ac968030890
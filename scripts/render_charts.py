@@ -0,0 +1,134 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from workbook_cache import read_sheet
+from excel_stream import MONTHLY_VOLUME_SCHEMA
+from vintages import latest_values, load_vintages
+from volume_cube import VolumeCube
+
+CHART_TYPES = ['stacked', 'growth']
+PERIODS = ['Monthly', 'Quarterly', 'Semi-annually', 'Year-to-date']
+# Periods per year, i.e. the lag of the year-on-year comparison
+YOY_LAG = {'Monthly': 12, 'Quarterly': 4, 'Semi-annually': 2, 'Year-to-date': 1}
+POP_LABEL = {'Monthly': 'Month-on-Month', 'Quarterly': 'Quarter-on-Quarter',
+             'Semi-annually': 'Half-on-Half', 'Year-to-date': 'Year-on-Year'}
+
+# Set once per worker process by the pool initializer, so jobs only carry their parameters
+_cube: Optional[VolumeCube] = None
+_colors: Dict[str, tuple] = {}
+
+def load_cube(workbook: Optional[str] = None) -> VolumeCube:
+    """Latest values across every workbook vintage, or one workbook's sheet"""
+    if workbook is None:
+        df = latest_values(load_vintages()).drop(columns='Vintage')
+    else:
+        df = read_sheet(workbook, sheet_name='Monthly container volume', schema=MONTHLY_VOLUME_SCHEMA)
+    return VolumeCube.from_frame(df.dropna())
+
+def resolve_company_sets(cube: VolumeCube, specs: List[str]) -> List[Tuple[str, List[str]]]:
+    """(name, companies) for each spec: 'topN', 'all' or a comma-separated company list"""
+    totals = cube.rollup('Company').sum(axis=1).sort_values(ascending=False)
+    sets = []
+    for spec in specs:
+        if spec == 'all':
+            sets.append(('all', sorted(totals.index)))
+        elif spec.startswith('top') and spec[3:].isdigit():
+            sets.append((spec, list(totals.index[:int(spec[3:])])))
+        else:
+            wanted = [c.strip() for c in spec.split(',') if c.strip()]
+            companies = [c for c in wanted if c in totals.index]
+            missing = sorted(set(wanted) - set(companies))
+            if missing:
+                print(f"Skipping companies not in the data: {', '.join(missing)}", file=sys.stderr)
+            sets.append(('-'.join(c.lower() for c in wanted), companies))
+    return sets
+
+def _init_worker(cube: VolumeCube, colors: Dict[str, tuple]) -> None:
+    global _cube, _colors
+    import matplotlib
+    matplotlib.use('Agg')
+    _cube, _colors = cube, colors
+
+def _plot_stacked(plt, view: VolumeCube, companies: List[str], period: str):
+    table = view.table('Company').reindex(columns=companies, fill_value=0)
+    fig, ax = plt.subplots(figsize=(15, 8))
+    table.plot(kind='bar', stacked=True, ax=ax, color=[_colors[c] for c in table.columns], width=0.8)
+    ax.set_title(f'{period} Container Volume by Company', fontsize=14, pad=20)
+    ax.set_ylabel('Container Volume (Thousand TEUs)', fontsize=12)
+    ax.legend(title='Companies', bbox_to_anchor=(1.02, 1), loc='upper left')
+    return fig, ax
+
+def _plot_growth(plt, view: VolumeCube, companies: List[str], period: str):
+    totals = pd.Series(view.totals().to_numpy(), index=view.labels)
+    yoy = totals.pct_change(periods=YOY_LAG[period]) * 100
+    fig, ax = plt.subplots(figsize=(15, 8))
+    positions = np.arange(len(totals))
+    ax.plot(positions, yoy.to_numpy(), marker='o', label='Year-on-Year')
+    if period != 'Year-to-date':
+        ax.plot(positions, (totals.pct_change() * 100).to_numpy(), marker='o', label=POP_LABEL[period])
+    ax.axhline(0, color='grey', linewidth=1)
+    ax.set_xticks(positions)
+    ax.set_xticklabels(totals.index)
+    scope = ', '.join(companies) if len(companies) <= 6 else f'{len(companies)} companies'
+    ax.set_title(f'{period} Growth Rate ({scope})', fontsize=14, pad=20)
+    ax.set_ylabel('Growth Rate (%)', fontsize=12)
+    ax.legend(loc='upper left')
+    return fig, ax
+
+PLOTTERS = {'stacked': _plot_stacked, 'growth': _plot_growth}
+
+def render_job(job: Tuple[str, str, Tuple[str, ...], str, str, int]) -> str:
+    """Render one chart type x company set x period image in a worker; returns its path"""
+    import matplotlib.pyplot as plt
+    chart, set_name, companies, period, output_dir, dpi = job
+    view = _cube.select(companies=companies).to_periods(period).trim().scaled(1 / 1000)
+    fig, ax = PLOTTERS[chart](plt, view, list(companies), period)
+    ax.set_xlabel('Period', fontsize=12)
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    path = os.path.join(output_dir, f"{chart}_{set_name}_{period.lower().replace('-', '_')}.png")
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Render report charts in parallel from one load of the data')
+    parser.add_argument('--charts', nargs='+', choices=CHART_TYPES, default=CHART_TYPES)
+    parser.add_argument('--companies', nargs='+', default=['top5'],
+                        help="company sets: 'topN', 'all' or a comma-separated list such as SNP,GMD,PHP")
+    parser.add_argument('--periods', nargs='+', choices=PERIODS, default=PERIODS)
+    parser.add_argument('--workbook', help='render from this workbook instead of the latest values of every vintage in data/')
+    parser.add_argument('--output-dir', default='charts')
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    cube = load_cube(args.workbook)
+    # Fixed colour per company, so a company looks the same in every image
+    import matplotlib
+    palette = matplotlib.colormaps['tab20'].colors
+    colors = {c: palette[i % len(palette)] for i, c in enumerate(cube.axes[1])}
+    jobs = [(chart, set_name, tuple(companies), period, args.output_dir, args.dpi)
+            for chart, (set_name, companies), period in itertools.product(
+                args.charts, resolve_company_sets(cube, args.companies), args.periods)
+            if companies]
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(cube, colors)) as pool:
+        for path in pool.map(render_job, jobs):
+            print(path)
+    print(f'Rendered {len(jobs)} charts in {time.perf_counter() - start:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'stage_timings.jsonl')
+SESSION_KEY = '_stage_timer_runs'
+MAX_SESSION_RUNS = 50
+
+# tracemalloc is process-wide, so it runs while any enabled timer is unfinished and stops with
+# the last one, unless something else had started it
+_tracing_lock = threading.Lock()
+_tracing_timers = 0
+_started_tracing = False
+
+def _acquire_tracing() -> None:
+    global _tracing_timers, _started_tracing
+    with _tracing_lock:
+        if _tracing_timers == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_timers += 1
+
+def _release_tracing() -> None:
+    global _tracing_timers, _started_tracing
+    with _tracing_lock:
+        _tracing_timers -= 1
+        if _tracing_timers == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+class StageTimer:
+    """Wall time and peak traced memory for each named stage of one script run"""
+
+    def __init__(self, enabled: bool, script: str, session_id: Optional[str] = None):
+        self.enabled = enabled
+        self.script = script
+        self.session_id = session_id
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.records: List[Dict] = []
+        self._tracing = enabled
+        if enabled:
+            _acquire_tracing()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        # tracemalloc is process-wide, so peaks include concurrent sessions' allocations
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            self.records.append({
+                'stage': name,
+                'wall_ms': round(elapsed * 1000, 3),
+                'peak_mb': round(max(peak - base, 0) / 2 ** 20, 3),
+            })
+
+    def finish(self, log_path: str = LOG_PATH) -> None:
+        """Release tracing and append this run's stages to the JSONL log"""
+        if not self.enabled:
+            return
+        if self._tracing:
+            self._tracing = False
+            _release_tracing()
+        run = {
+            'ts': self.started_at,
+            'script': self.script,
+            'session_id': self.session_id,
+            'run_id': self.run_id,
+            'total_ms': round(sum(r['wall_ms'] for r in self.records), 3),
+        }
+        try:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            with open(log_path, 'a', encoding='utf-8') as f:
+                for record in self.records:
+                    f.write(json.dumps({**run, **record}) + '\n')
+        except OSError:
+            # Logging must never break the page
+            pass
+
+def start_run(script: str, enabled: bool) -> StageTimer:
+    """Timer for the current Streamlit rerun, tagged with its session id"""
+    session_id = None
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        session_id = ctx.session_id if ctx is not None else None
+    except ImportError:
+        pass
+    return StageTimer(enabled, script, session_id)
+
+def render_panel(timer: StageTimer) -> None:
+    """Sidebar debug panel with this rerun's stages and per-stage averages for the session"""
+    if not timer.enabled:
+        return
+    runs = st.session_state.setdefault(SESSION_KEY, [])
+    runs.append(timer.records)
+    del runs[:-MAX_SESSION_RUNS]
+
+    with st.sidebar.expander("🛠 Performance debug", expanded=True):
+        if not timer.records:
+            st.write("No stages recorded.")
+            return
+        last = pd.DataFrame(timer.records).set_index('stage')
+        st.write(f"**This rerun:** {last['wall_ms'].sum():,.1f} ms")
+        st.dataframe(last.rename(columns={'wall_ms': 'Wall (ms)', 'peak_mb': 'Peak (MB)'}))
+        history = pd.DataFrame([r for run in runs for r in run])
+        summary = history.groupby('stage', sort=False).agg(
+            runs=('wall_ms', 'size'), mean_ms=('wall_ms', 'mean'), max_ms=('wall_ms', 'max'), peak_mb=('peak_mb', 'max'))
+        st.write(f"**Session ({len(runs)} reruns)**")
+        st.dataframe(summary.round(2))
+        st.caption(f"Appended to {os.path.relpath(LOG_PATH)}")
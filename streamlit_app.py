@@ -1,139 +1,168 @@
 
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
-from db import init_db, import_excel_to_db, fetch_all, insert_row, to_dataframe
+from db import init_db, import_excel_to_db, insert_row, data_version, load_snapshot, query_quarters, query_growth
+import stage_timer
+from downsample import downsample
+from dataset_registry import DatasetRegistry
 
 
 
 DB_PATH = 'monthly_income.db'
 
-# Initialize DB and import Excel if DB empty
-init_db()
-rows = fetch_all()
-if not rows:
-	import_excel_to_db('Monthly income by quarter_2015-2025.xlsx')
-	rows = fetch_all()
-# Convert to dataframe
-df = pd.DataFrame([dict(r) for r in rows])
-if not df.empty:
-	df['Quarter'] = pd.to_datetime(df['quarter_dt'])
-	df = df.rename(columns={'urban':'Urban','rural':'Rural','nationwide':'Nationwide'})
-else:
-	df = pd.DataFrame(columns=['Quarter','Urban','Rural','Nationwide'])
-
-
-# Convert Quarter column to datetime for filtering
-df['Quarter'] = pd.to_datetime(df['Quarter'])
-
-st.title('Average monthly income per salaried worker by Quarter (2015-2025)')
-st.write('Preview of data:', df.head())
-
-
-# Add control to select timeframe by quarter
-quarter_options = df['Quarter'].dt.to_period('Q').astype(str).unique().tolist()
-quarter_options.sort()
-start_quarter, end_quarter = st.select_slider(
-	'Select timeframe (quarter):',
-	options=quarter_options,
-	value=(quarter_options[0], quarter_options[-1])
-)
-
-# Filter data by selected quarters
-filtered_df = df[
-	(df['Quarter'].dt.to_period('Q').astype(str) >= start_quarter) &
-	(df['Quarter'].dt.to_period('Q').astype(str) <= end_quarter)
-]
-
-
-# Add control to select worker type(s)
-worker_types = st.multiselect(
-	'Select worker type(s):',
-	['Urban', 'Rural', 'Nationwide'],
-	default=['Urban', 'Rural', 'Nationwide']
-)
-
-
-# Color panel from attachment
-color_panel = [
-	'#184C43',  # dark green
-	'#00C98D',  # teal
-	'#B8925A',  # gold
-	'#A1A1A1',  # gray
-	'#000000',  # black
-	'#FFFFFF'   # white
-]
-
-# Assign colors for worker types
-worker_color_map = {
-	'Urban': color_panel[0],
-	'Rural': color_panel[1],
-	'Nationwide': color_panel[2]
-}
-
-
-# Round income values to 1 decimal place before plotting
-fig = go.Figure()
-for i, wt in enumerate(worker_types):
-	fig.add_trace(go.Scatter(x=filtered_df['Quarter'], y=filtered_df[wt].round(1), mode='lines+markers', name=wt, line=dict(color=worker_color_map.get(wt, color_panel[i%len(color_panel)]))))
-fig.update_layout(
-	title=f"Average monthly income per salaried worker by Quarter (2015-2025) - {' & '.join(worker_types) if worker_types else 'None'}",
-	xaxis_title='Quarter',
-	yaxis_title='Monthly Income (VND mn)',
-	legend_title='Worker Type',
-	hovermode='x unified'
-)
-st.plotly_chart(fig, use_container_width=True)
-
-# Add control for growth chart worker type
-growth_worker_type = st.selectbox(
-	'Select worker type for growth chart:',
-	['Urban', 'Rural', 'Nationwide'],
-	index=0,
-	key='growth_worker_type'
-)
-
-
-# Calculate QoQ and YoY growth, rounded to 1 decimal (filtered)
-qoq_growth = (filtered_df[growth_worker_type].pct_change() * 100).round(1)
-yoy_growth = (filtered_df[growth_worker_type].pct_change(periods=4) * 100).round(1)
-
-
-
-# Use two distinct colors for QoQ and YoY growth lines
-qoq_color = color_panel[0]  # dark green
-yoy_color = color_panel[1]  # teal
-
-growth_fig = go.Figure()
-growth_fig.add_trace(go.Scatter(
-	x=df['Quarter'], y=qoq_growth, mode='lines+markers',
-	name=f'{growth_worker_type} QoQ Growth (%)',
-	line=dict(dash='dot', color=qoq_color)
-))
-growth_fig.add_trace(go.Scatter(
-	x=df['Quarter'], y=yoy_growth, mode='lines+markers',
-	name=f'{growth_worker_type} YoY Growth (%)',
-	line=dict(dash='dash', color=yoy_color)
-))
-growth_fig.update_layout(
-	title=f'YoY and QoQ Growth for {growth_worker_type} (2015-2025)',
-	xaxis_title='Quarter',
-	yaxis_title='Growth (%)',
-	legend_title='Growth Type',
-	hovermode='x unified'
-)
-st.plotly_chart(growth_fig, use_container_width=True)
-
-# Admin form to add monthly datapoint
-st.markdown('---')
-st.subheader('Admin: add / update monthly datapoint')
-with st.form('add_row'):
-	q_label = st.text_input('Quarter label (YYYY-MM-DD)', value='')
-	q_date = st.date_input('Quarter date')
-	urban_val = st.number_input('Urban', value=0.0, format='%.2f')
-	rural_val = st.number_input('Rural', value=0.0, format='%.2f')
-	nationwide_val = st.number_input('Nationwide', value=0.0, format='%.2f')
-	submitted = st.form_submit_button('Save')
-	if submitted:
-		insert_row(q_label or q_date.strftime('%Y-%m-%d'), q_date.strftime('%Y-%m-%d'), urban_val, rural_val, nationwide_val)
-		st.success('Row saved to DB. Refresh the page to see updates.')
+# Opt-in per-stage timing; results go to the sidebar panel and logs/stage_timings.jsonl
+timer = stage_timer.start_run('streamlit_app', st.sidebar.checkbox('🛠 Performance debug panel', value=False))
+try:
+	@st.cache_resource
+	def datasets():
+		return DatasetRegistry.from_env()
+
+	# One frame per data version of the DB, shared read-only by every session; reruns only
+	# re-read the DB after a write commits
+	def load_income(version):
+		return datasets().get_or_load(('monthly_income', version), _read_income)
+
+	def _read_income():
+		# Memory-mapped from the table's Arrow snapshot instead of fetched row by row
+		return load_snapshot().rename(columns={'quarter_dt':'Quarter','urban':'Urban','rural':'Rural','nationwide':'Nationwide'})
+
+	# Quarter ranges are filtered in SQL and growth is read from the table kept up to date on
+	# insert, so a rerun only slices; results are shared per data version like the full frame
+	def load_quarters(version, start, end):
+		return datasets().get_or_load(('quarters', version, start, end), lambda: query_quarters(start, end))
+
+	def load_growth(version, worker_type, start, end):
+		return datasets().get_or_load(('growth', version, worker_type, start, end),
+			lambda: query_growth(worker_type, start, end))
+
+	# Initialize DB and import Excel if DB empty
+	with timer.stage('load_data'):
+		init_db()
+		version = data_version()
+		df = load_income(version)
+		if df.empty:
+			import_excel_to_db('Monthly income by quarter_2015-2025.xlsx')
+			version = data_version()
+			df = load_income(version)
+
+
+	st.title('Average monthly income per salaried worker by Quarter (2015-2025)')
+	st.write('Preview of data:', df.head())
+
+
+	# Add control to select timeframe by quarter
+	quarter_options = datasets().get_or_load(('quarter_options', version),
+		lambda: sorted(df['Quarter'].dt.to_period('Q').astype(str).unique().tolist()))
+	start_quarter, end_quarter = st.select_slider(
+		'Select timeframe (quarter):',
+		options=quarter_options,
+		value=(quarter_options[0], quarter_options[-1])
+	)
+
+	# Filter data by selected quarters
+	with timer.stage('filter'):
+		filtered_df = load_quarters(version, start_quarter, end_quarter)
+
+
+	# Add control to select worker type(s)
+	worker_types = st.multiselect(
+		'Select worker type(s):',
+		['Urban', 'Rural', 'Nationwide'],
+		default=['Urban', 'Rural', 'Nationwide']
+	)
+
+
+	# Color panel from attachment
+	color_panel = [
+		'#184C43',  # dark green
+		'#00C98D',  # teal
+		'#B8925A',  # gold
+		'#A1A1A1',  # gray
+		'#000000',  # black
+		'#FFFFFF'   # white
+	]
+
+	# Assign colors for worker types
+	worker_color_map = {
+		'Urban': color_panel[0],
+		'Rural': color_panel[1],
+		'Nationwide': color_panel[2]
+	}
+
+
+	# Round income values to 1 decimal place before plotting
+	fig = go.Figure()
+	for i, wt in enumerate(worker_types):
+		fig.add_trace(go.Scatter(x=filtered_df.index, y=filtered_df[wt].round(1), mode='lines+markers', name=wt, line=dict(color=worker_color_map.get(wt, color_panel[i%len(color_panel)]))))
+	fig.update_layout(
+		title=f"Average monthly income per salaried worker by Quarter (2015-2025) - {' & '.join(worker_types) if worker_types else 'None'}",
+		xaxis_title='Quarter',
+		yaxis_title='Monthly Income (VND mn)',
+		legend_title='Worker Type',
+		hovermode='x unified'
+	)
+	st.plotly_chart(fig, use_container_width=True)
+
+	# Add control for growth chart worker type
+	growth_worker_type = st.selectbox(
+		'Select worker type for growth chart:',
+		['Urban', 'Rural', 'Nationwide'],
+		index=0,
+		key='growth_worker_type'
+	)
+
+
+	# Stored QoQ and YoY growth of the selected quarters, rounded to 1 decimal
+	with timer.stage('growth'):
+		growth = load_growth(version, growth_worker_type, start_quarter, end_quarter)
+		qoq_growth = growth['QoQ'].round(1)
+		yoy_growth = growth['YoY'].round(1)
+
+	# Optional LTTB downsampling of long growth series before the figure is built
+	if st.checkbox('Downsample long growth series', value=False):
+		max_points = st.slider('Max points per growth series', 20, 500, 120, step=10)
+		qoq_growth = downsample(qoq_growth, max_points)
+		yoy_growth = downsample(yoy_growth, max_points)
+
+
+
+	# Use two distinct colors for QoQ and YoY growth lines
+	qoq_color = color_panel[0]  # dark green
+	yoy_color = color_panel[1]  # teal
+
+	growth_fig = go.Figure()
+	growth_fig.add_trace(go.Scatter(
+		x=qoq_growth.index, y=qoq_growth, mode='lines+markers',
+		name=f'{growth_worker_type} QoQ Growth (%)',
+		line=dict(dash='dot', color=qoq_color)
+	))
+	growth_fig.add_trace(go.Scatter(
+		x=yoy_growth.index, y=yoy_growth, mode='lines+markers',
+		name=f'{growth_worker_type} YoY Growth (%)',
+		line=dict(dash='dash', color=yoy_color)
+	))
+	growth_fig.update_layout(
+		title=f'YoY and QoQ Growth for {growth_worker_type} (2015-2025)',
+		xaxis_title='Quarter',
+		yaxis_title='Growth (%)',
+		legend_title='Growth Type',
+		hovermode='x unified'
+	)
+	st.plotly_chart(growth_fig, use_container_width=True)
+
+	# Admin form to add monthly datapoint
+	st.markdown('---')
+	st.subheader('Admin: add / update monthly datapoint')
+	with st.form('add_row'):
+		q_label = st.text_input('Quarter label (YYYY-MM-DD)', value='')
+		q_date = st.date_input('Quarter date')
+		urban_val = st.number_input('Urban', value=0.0, format='%.2f')
+		rural_val = st.number_input('Rural', value=0.0, format='%.2f')
+		nationwide_val = st.number_input('Nationwide', value=0.0, format='%.2f')
+		submitted = st.form_submit_button('Save')
+		if submitted:
+			insert_row(q_label or q_date.strftime('%Y-%m-%d'), q_date.strftime('%Y-%m-%d'), urban_val, rural_val, nationwide_val)
+			st.success('Row saved to DB. Refresh the page to see updates.')
+finally:
+	timer.finish()
+	stage_timer.render_panel(timer)
@@ -0,0 +1,87 @@
+import argparse
+import glob
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'snapshots')
+
+# Exports of one (database, table) run one at a time within a process
+_export_locks: Dict[str, threading.Lock] = {}
+_export_locks_lock = threading.Lock()
+
+def _prefix(db_path: str, table: str, snapshot_dir: Optional[str]) -> str:
+    # Databases with the same file name in different directories get different snapshots
+    abs_path = os.path.abspath(db_path)
+    name = os.path.splitext(os.path.basename(abs_path))[0]
+    tag = hashlib.sha1(abs_path.encode()).hexdigest()[:8]
+    return os.path.join(snapshot_dir or SNAPSHOT_DIR, f'{name}-{tag}-{table}-v')
+
+def snapshot_path(db_path: str, table: str, version: int, snapshot_dir: Optional[str] = None) -> str:
+    return f'{_prefix(db_path, table, snapshot_dir)}{version}.arrow'
+
+def export(df: pd.DataFrame, db_path: str, table: str, version: int, snapshot_dir: Optional[str] = None) -> str:
+    """Write `df` as the uncompressed Arrow IPC snapshot of `table` at `version`, replacing older ones"""
+    prefix = _prefix(db_path, table, snapshot_dir)
+    dest = snapshot_path(db_path, table, version, snapshot_dir)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+    with _export_locks_lock:
+        lock = _export_locks.setdefault(prefix, threading.Lock())
+    with lock:
+        # Written under a temporary name per process and thread and renamed, so readers never
+        # map a partial file and concurrent writers never share one
+        tmp = f'{dest}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        # Only older versions go; a slow export of an old version never removes a newer one
+        for old in glob.glob(f'{glob.escape(prefix)}*.arrow'):
+            match = re.fullmatch(r'(\d+)\.arrow', old[len(prefix):])
+            if match and int(match.group(1)) < version:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+    return dest
+
+def read(path: str) -> pd.DataFrame:
+    """Frame over a memory-mapped snapshot file; FileNotFoundError if it was superseded meanwhile"""
+    # Fixed-width columns without nulls stay views of the mapped pages, which the OS cache
+    # shares between processes; they are read-only, like every shared dataset
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(split_blocks=True)
+
+def load(db_path: str, table: str, version: int, snapshot_dir: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Snapshot of `table` at exactly `version`, or None when it has not been exported"""
+    # No exists() check first: a newer export may remove the file between the check and the open
+    try:
+        return read(snapshot_path(db_path, table, version, snapshot_dir))
+    except FileNotFoundError:
+        return None
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import db
+    import ports_db
+    parser = argparse.ArgumentParser(description='Export the throughput and monthly income tables as Arrow snapshots')
+    parser.add_argument('--ports-db', default=ports_db.DB_PATH)
+    parser.add_argument('--income-db', default=db.DB_PATH)
+    parser.add_argument('--dir', default=SNAPSHOT_DIR)
+    args = parser.parse_args(argv)
+
+    for module, path in ((ports_db, args.ports_db), (db, args.income_db)):
+        if os.path.exists(path):
+            print(module.export_snapshot(path, args.dir))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from import_jobs import validate_chunk
+
+def _chunk(rows, first_row=2):
+    df = pd.DataFrame(rows, columns=['region', 'company', 'port', 'total throughput', 'date'])
+    df.index = range(first_row, first_row + len(df))
+    return df
+
+def test_port_may_change_company_across_months():
+    companies = {}
+    good, errors = validate_chunk(_chunk([
+        ['South', 'SNP', 'Cat Lai', 100.0, '2024-01-01'],
+        ['South', 'FLDC', 'Cat Lai', 110.0, '2024-02-01'],
+    ]), companies)
+    assert errors.empty
+    assert good['company'].tolist() == ['SNP', 'FLDC']
+    # A later chunk of the same file may switch back in another month
+    good, errors = validate_chunk(_chunk([['South', 'SNP', 'Cat Lai', 120.0, '2024-03-01']], 4), companies)
+    assert errors.empty and len(good) == 1
+
+def test_same_port_and_month_must_agree_on_company():
+    companies = {}
+    validate_chunk(_chunk([['South', 'SNP', 'Cat Lai', 100.0, '2024-01-01']]), companies)
+    good, errors = validate_chunk(_chunk([
+        ['South', 'FLDC', 'Cat Lai', 100.0, '2024-01-01'],
+        ['South', 'FLDC', 'Cat Lai', 90.0, '2024-02-01'],
+    ], 3), companies)
+    assert errors['row'].tolist() == [3]
+    assert errors['field'].tolist() == ['company']
+    assert good['month'].tolist() == [2]
+
+def test_error_rows_are_source_row_numbers():
+    good, errors = validate_chunk(_chunk([
+        ['South', 'SNP', 'Cat Lai', 100.0, '2024-01-01'],
+        ['South', 'SNP', 'Cat Lai', -1.0, '2024-02-01'],
+    ], 10), {})
+    assert errors['row'].tolist() == [11]
+    assert len(good) == 1
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from prefix_index import PrefixSumIndex
+
+def _frame(values):
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2023-01-01', '2023-02-01', '2024-01-01', '2024-02-01']),
+        'Company': ['A', 'B', 'A', 'B'],
+        'Total throughput': values,
+    })
+
+def test_range_totals():
+    index = PrefixSumIndex.from_frame(_frame([1.0, 2.0, 3.0, 4.0]))
+    assert index.range_total() == 10.0
+    assert index.range_total(['A'], '2023-01-01', '2023-12-01') == 1.0
+    assert index.range_total(['B'], '2023-02-01', '2024-02-01') == 6.0
+    assert index.totals('2024-01-01', '2024-02-01').to_dict() == {'A': 3.0, 'B': 4.0}
+
+def test_rebuild_reflects_total_preserving_revision():
+    # Moving volume between companies and months keeps the grand total the same
+    index = PrefixSumIndex.from_frame(_frame([5.0, 2.0, 3.0, 4.0]))
+    assert index.range_total(['A'], '2023-01-01', '2023-01-01') == 5.0
+    revised = PrefixSumIndex.from_frame(_frame([1.0, 6.0, 3.0, 4.0]))
+    assert revised.range_total() == index.range_total()
+    assert revised.range_total(['A'], '2023-01-01', '2023-01-01') == 1.0
+    assert revised.range_total(['B'], '2023-02-01', '2023-02-01') == 6.0
+
+def test_same_period_last_year():
+    index = PrefixSumIndex.from_frame(_frame([1.0, 2.0, 3.0, 4.0]))
+    assert index.same_period_last_year(None, '2024-01-01', '2024-02-01') == (7.0, 3.0)
+    # The year before the first indexed month is not compared against a clamped window
+    assert index.same_period_last_year(None, '2023-01-01', '2023-02-01') == (3.0, None)
@@ -0,0 +1,148 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import ports_db
+import workbook_cache
+from excel_stream import MONTHLY_VOLUME_SCHEMA
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SHEET = 'Monthly container volume'
+# Each monthly edition of the workbook is a vintage, named after its suffix ('Aug 2025' -> '2025-08')
+WORKBOOK_PATTERN = re.compile(r'^Monthly container volume -\s+Quarterly sales and NPATMI_([A-Za-z]{3} \d{4})\.xlsx$')
+# An observation is one port-month; its value may be revised by later vintages
+KEYS = ['Port', 'Month']
+VALUE_COL = 'Total throughput'
+
+def discover_workbooks(data_dir: str = DATA_DIR) -> Dict[str, str]:
+    """Vintage -> workbook path for every edition in `data_dir`, oldest first"""
+    found = {}
+    for entry in os.listdir(data_dir):
+        match = WORKBOOK_PATTERN.match(entry)
+        if match:
+            vintage = pd.to_datetime(match.group(1), format='%b %Y').strftime('%Y-%m')
+            found[vintage] = os.path.join(data_dir, entry)
+    return dict(sorted(found.items()))
+
+def latest_workbook(data_dir: str = DATA_DIR) -> str:
+    workbooks = discover_workbooks(data_dir)
+    if not workbooks:
+        raise FileNotFoundError(f'No monthly container volume workbooks in {data_dir}')
+    return workbooks[max(workbooks)]
+
+def workbooks_version(workbooks: Dict[str, str]) -> tuple:
+    """Cheap version stamp of a vintage set that changes when any workbook is added or rewritten"""
+    return tuple((vintage, os.stat(path).st_size, os.stat(path).st_mtime_ns) for vintage, path in workbooks.items())
+
+def _read_vintage(path: str) -> pd.DataFrame:
+    return workbook_cache.read_sheet(path, sheet_name=SHEET, schema=MONTHLY_VOLUME_SCHEMA)
+
+def load_vintages(workbooks: Optional[Dict[str, str]] = None, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Observations of every vintage stacked with a leading Vintage column"""
+    if workbooks is None:
+        workbooks = discover_workbooks()
+    frames = {}
+    pending = []
+    for vintage, path in workbooks.items():
+        if workbook_cache.is_cached(path, SHEET, schema=MONTHLY_VOLUME_SCHEMA):
+            frames[vintage] = _read_vintage(path)
+        else:
+            pending.append(vintage)
+    # Workbooks without a sidecar are parsed in parallel, one worker process per workbook
+    if len(pending) > 1:
+        workers = min(len(pending), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames.update(zip(pending, pool.map(_read_vintage, [workbooks[v] for v in pending])))
+    else:
+        frames.update((v, _read_vintage(workbooks[v])) for v in pending)
+    if not frames:
+        return pd.DataFrame(columns=['Vintage', *MONTHLY_VOLUME_SCHEMA])
+    return pd.concat([df.assign(Vintage=v)[['Vintage', *df.columns]] for v, df in sorted(frames.items())],
+                     ignore_index=True)
+
+def _keyed(observations: pd.DataFrame) -> pd.DataFrame:
+    # Month-start key, so a reporting date of the 2nd still matches the same month elsewhere
+    dates = pd.to_datetime(observations['Date']).to_numpy()
+    return observations.assign(Month=dates.astype('datetime64[M]'))
+
+def latest_values(observations: pd.DataFrame) -> pd.DataFrame:
+    """The most recent vintage's value of every observation, including ones later vintages dropped"""
+    keyed = _keyed(observations).sort_values('Vintage', kind='stable')
+    latest = keyed.drop_duplicates(KEYS, keep='last').drop(columns='Month')
+    return latest.sort_values(['Date', 'Port'], kind='stable').reset_index(drop=True)
+
+def revisions(observations: pd.DataFrame, base: Optional[str] = None, target: Optional[str] = None) -> pd.DataFrame:
+    """Per-observation changes from vintage `base` to `target` (default: the two newest)"""
+    # status is 'revised', 'unchanged', 'added' (new in target) or 'removed' (only in base)
+    vintages = sorted(observations['Vintage'].unique())
+    if target is None:
+        target = vintages[-1]
+    if base is None:
+        earlier = [v for v in vintages if v < target]
+        if not earlier:
+            raise ValueError(f'No vintage before {target} to compare against')
+        base = earlier[-1]
+    keyed = _keyed(observations)
+    cols = [*KEYS, 'Date', 'Region', 'Company', VALUE_COL]
+    old = keyed.loc[keyed['Vintage'] == base, cols]
+    new = keyed.loc[keyed['Vintage'] == target, cols]
+    # Keyed hash join of the two vintages on port-month
+    merged = new.merge(old, on=KEYS, how='outer', suffixes=('', '_base'), indicator=True)
+    for col in ('Date', 'Region', 'Company'):
+        merged[col] = merged[col].fillna(merged[f'{col}_base'])
+    merged = merged.rename(columns={VALUE_COL: 'Target', f'{VALUE_COL}_base': 'Base'})
+    merged['Revision'] = merged['Target'] - merged['Base']
+    merged['Revision %'] = merged['Revision'] / merged['Base'].where(merged['Base'] != 0) * 100
+    same = np.isclose(merged['Target'], merged['Base'], equal_nan=True)
+    merged['Status'] = np.select(
+        [merged['_merge'] == 'left_only', merged['_merge'] == 'right_only', same],
+        ['added', 'removed', 'unchanged'], 'revised')
+    merged.insert(0, 'Base vintage', base)
+    merged.insert(1, 'Target vintage', target)
+    out = merged[['Base vintage', 'Target vintage', 'Date', 'Region', 'Company', 'Port',
+                  'Base', 'Target', 'Revision', 'Revision %', 'Status']]
+    return out.sort_values(['Date', 'Port'], kind='stable').reset_index(drop=True)
+
+def ingest(data_dir: str = DATA_DIR, db_path: str = ports_db.DB_PATH, max_workers: Optional[int] = None,
+           force: bool = False) -> List[str]:
+    """Store every workbook vintage not yet in the ports DB; returns the vintages written"""
+    workbooks = discover_workbooks(data_dir)
+    if not force:
+        stored = set(ports_db.stored_vintages(db_path))
+        workbooks = {v: p for v, p in workbooks.items() if v not in stored}
+    observations = load_vintages(workbooks, max_workers)
+    for vintage, df in observations.groupby('Vintage', sort=True):
+        ports_db.insert_vintage(df.drop(columns='Vintage'), vintage, db_path)
+    return list(workbooks)
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Ingest every workbook vintage and report revisions between them')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--db', default=ports_db.DB_PATH)
+    parser.add_argument('--max-workers', type=int)
+    parser.add_argument('--force', action='store_true', help='re-ingest vintages already stored')
+    args = parser.parse_args(argv)
+
+    written = ingest(args.data_dir, args.db, args.max_workers, args.force)
+    print(f"Ingested vintages: {', '.join(written) or 'none (all up to date)'}")
+    stored = ports_db.stored_vintages(args.db)
+    if written:
+        from completeness import check_completeness
+        latest = ports_db.fetch_vintages(stored[-1:], path=args.db)
+        print(f'Completeness of {stored[-1]}:', check_completeness(latest).counts())
+    if len(stored) < 2:
+        return
+    report = revisions(ports_db.fetch_vintages(stored[-2:], path=args.db))
+    print(f'Changes {stored[-2]} -> {stored[-1]}:')
+    print(report['Status'].value_counts().to_string())
+    changed = report[report['Status'] == 'revised']
+    if not changed.empty:
+        print(changed.to_string(index=False))
+
+if __name__ == '__main__':
+    main()
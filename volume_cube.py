@@ -0,0 +1,142 @@
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ['Region', 'Company', 'Port']
+
+def month_numbers(dates: pd.Series) -> np.ndarray:
+    """Months since year 0 of each date, so consecutive months differ by one"""
+    dates = pd.to_datetime(dates)
+    return dates.dt.year.to_numpy() * 12 + dates.dt.month.to_numpy() - 1
+
+def month_starts(numbers: np.ndarray) -> pd.DatetimeIndex:
+    """First day of each month number from month_numbers()"""
+    return pd.DatetimeIndex((np.asarray(numbers) - 1970 * 12).astype('datetime64[M]'))
+
+class VolumeCube:
+    """Region x company x port x period throughput held as a dense series x period array"""
+
+    # Each (region, company, port) combination that occurs is one series row; the three
+    # dimension axes are categorical indexes and `codes` maps every row onto them.
+    def __init__(self, values: np.ndarray, codes: np.ndarray, axes: List[pd.Index],
+                 periods: pd.DatetimeIndex, labels: List[str]):
+        self.values = values
+        self.codes = codes
+        self.axes = axes
+        self.periods = periods
+        self.labels = labels
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, date_col: str = 'Date', value_col: str = 'Total throughput',
+                   dtype=np.float64) -> 'VolumeCube':
+        if df.empty:
+            return cls(np.zeros((0, 0), dtype=dtype), np.zeros((0, 3), dtype=np.int32),
+                       [pd.Index([], name=d) for d in DIMENSIONS], pd.DatetimeIndex([]), [])
+        months = month_numbers(df[date_col])
+        first, last = int(months.min()), int(months.max())
+        cats = [pd.Categorical(df[d]) for d in DIMENSIONS]
+        axes = [pd.Index(c.categories, name=d) for c, d in zip(cats, DIMENSIONS)]
+        # Series rows are the distinct (region, company, port) code triples
+        triples = np.stack([c.codes for c in cats], axis=1).astype(np.int32)
+        codes, series = np.unique(triples, axis=0, return_inverse=True)
+        values = np.zeros((len(codes), last - first + 1), dtype=dtype)
+        np.add.at(values, (series.ravel(), months - first),
+                  np.nan_to_num(pd.to_numeric(df[value_col], errors='coerce').to_numpy(dtype=float)))
+        periods = month_starts(np.arange(first, last + 1))
+        return cls(values, codes, axes, periods, [p.strftime('%b-%y') for p in periods])
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.codes.nbytes
+
+    def _with(self, values: np.ndarray, codes: Optional[np.ndarray] = None,
+              periods: Optional[pd.DatetimeIndex] = None, labels: Optional[List[str]] = None) -> 'VolumeCube':
+        return VolumeCube(values, self.codes if codes is None else codes, self.axes,
+                          self.periods if periods is None else periods,
+                          self.labels if labels is None else labels)
+
+    def select(self, regions: Optional[Iterable[str]] = None, companies: Optional[Iterable[str]] = None,
+               ports: Optional[Iterable[str]] = None, start=None, end=None) -> 'VolumeCube':
+        """Slice by dimension members and an inclusive date range; a pure period slice is a view"""
+        rows = np.ones(len(self.codes), dtype=bool)
+        for i, members in enumerate((regions, companies, ports)):
+            if members is not None:
+                rows &= np.isin(self.codes[:, i], self.axes[i].get_indexer(list(members)))
+        lo = 0 if start is None else self.periods.searchsorted(pd.Timestamp(start))
+        hi = len(self.periods) if end is None else self.periods.searchsorted(pd.Timestamp(end), side='right')
+        values = self.values[:, lo:hi] if rows.all() else self.values[rows, lo:hi]
+        return self._with(values, self.codes[rows], self.periods[lo:hi], self.labels[lo:hi])
+
+    def trim(self) -> 'VolumeCube':
+        """Drop leading and trailing periods without any volume"""
+        active = np.flatnonzero(self.values.any(axis=0))
+        if not len(active):
+            return self._with(self.values[:, :0], periods=self.periods[:0], labels=[])
+        lo, hi = active[0], active[-1] + 1
+        return self._with(self.values[:, lo:hi], periods=self.periods[lo:hi], labels=self.labels[lo:hi])
+
+    def scaled(self, factor: float) -> 'VolumeCube':
+        return self._with(self.values * factor)
+
+    def rollup(self, by: str = 'Company') -> pd.DataFrame:
+        """Sum series into one row per member of dimension `by`, one column per period"""
+        axis = DIMENSIONS.index(by)
+        members, inverse = np.unique(self.codes[:, axis], return_inverse=True)
+        out = np.zeros((len(members), self.values.shape[1]), dtype=self.values.dtype)
+        np.add.at(out, inverse.ravel(), self.values)
+        return pd.DataFrame(out, index=self.axes[axis][members], columns=self.periods)
+
+    def totals(self) -> pd.Series:
+        """Grand total per period"""
+        return pd.Series(self.values.sum(axis=0), index=pd.Index(self.periods, name='Period'))
+
+    def to_periods(self, period: str = 'Monthly', ytd_month: Optional[int] = None) -> 'VolumeCube':
+        """Reindex monthly columns to Quarterly, Semi-annually or Year-to-date periods"""
+        if period == 'Monthly' or not len(self.periods):
+            return self
+        months = self.periods.year.to_numpy() * 12 + self.periods.month.to_numpy() - 1
+        if period == 'Quarterly':
+            keys = months - months % 3
+        elif period == 'Semi-annually':
+            keys = months - months % 6
+        elif period == 'Year-to-date':
+            # Every year is summed through the same cutoff month (default: the latest month)
+            cutoff = ytd_month or int(self.periods[-1].month)
+            keys = np.where(months % 12 < cutoff, months - months % 12, -1)
+        else:
+            raise ValueError(f'Unknown period: {period}')
+        unique_keys = np.unique(keys[keys >= 0])
+        # One-hot month -> period matrix turns the reindex into a single matmul
+        mapping = (keys[:, None] == unique_keys[None, :]).astype(self.values.dtype)
+        starts = month_starts(unique_keys)
+        if period == 'Quarterly':
+            periods = starts
+            labels = [f"Q{(p.month - 1) // 3 + 1}-{p.strftime('%y')}" for p in starts]
+        elif period == 'Semi-annually':
+            periods = starts
+            labels = [f"{'H1' if p.month <= 6 else 'H2'}-{p.strftime('%y')}" for p in starts]
+        else:
+            periods = pd.DatetimeIndex([pd.Timestamp(p.year, 12, 31) for p in starts])
+            labels = [f"YTD-{p.strftime('%y')}" for p in starts]
+        return self._with(self.values @ mapping, periods=periods, labels=labels)
+
+    def table(self, by: str = 'Company') -> pd.DataFrame:
+        """Period label x member table, as shown in the raw data view"""
+        wide = self.rollup(by).T
+        wide.index = pd.Index(self.labels, name='Period_Label')
+        wide.columns.name = by
+        return wide
+
+    def to_long(self, by: str = 'Company') -> pd.DataFrame:
+        """Long Period / Period_Label / member / Total throughput frame for chart encodings"""
+        wide = self.rollup(by)
+        n_members, n_periods = wide.shape
+        long = pd.DataFrame({
+            'Period': np.tile(self.periods, n_members),
+            'Period_Label': np.tile(np.asarray(self.labels, dtype=object), n_members),
+            by: np.repeat(wide.index.to_numpy(), n_periods),
+            'Total throughput': wide.to_numpy().ravel(),
+        })
+        # Members without volume in a period get no bar segment
+        return long[long['Total throughput'] != 0].reset_index(drop=True)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Union
+
+import pandas as pd
+
+from excel_stream import iter_sheet_chunks, read_sheet_streaming
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'workbooks')
+
+def _content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def workbook_fingerprint(path: str) -> Dict[str, Union[str, int]]:
+    """Identity of a workbook on disk: absolute path, size, mtime and content hash"""
+    stat = os.stat(path)
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _content_hash(path),
+    }
+
+def _sidecar_name(abs_path: str, sheet_name) -> str:
+    return hashlib.sha1(json.dumps([abs_path, str(sheet_name)]).encode()).hexdigest()[:16]
+
+def _schema_tag(schema: Optional[Dict[str, str]]) -> str:
+    if not schema:
+        return 'raw'
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:8]
+
+def _sidecar_paths(fingerprint: Dict[str, Union[str, int]], sheet_name, schema, cache_dir: str):
+    # One sidecar per workbook path, sheet and schema; the key suffix changes whenever the file does
+    prefix = f'{_sidecar_name(fingerprint["path"], sheet_name)}-{_schema_tag(schema)}-'
+    key = hashlib.sha1(json.dumps([fingerprint, str(sheet_name)], sort_keys=True).encode()).hexdigest()[:16]
+    return prefix, os.path.join(cache_dir, f'{prefix}{key}.parquet')
+
+def _stream_to_parquet(path: str, sheet_name, schema: Dict[str, str], target: str) -> None:
+    # Only one chunk of rows is held in memory while the sidecar is written
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    arrow_types = {'datetime': pa.timestamp('ns'), 'float': pa.float64(), 'string': pa.string()}
+    arrow_schema = pa.schema([(col, arrow_types[kind]) for col, kind in schema.items()])
+    with pq.ParquetWriter(target, arrow_schema) as writer:
+        for chunk in iter_sheet_chunks(path, sheet_name, list(schema), schema):
+            # Align to the schema's column names and order whatever the header's spelling
+            by_name = {str(c).strip().lower(): c for c in chunk.columns}
+            chunk = pd.DataFrame({col: chunk[by_name[col.lower()]] if col.lower() in by_name else None
+                                  for col in schema})
+            writer.write_table(pa.Table.from_pandas(chunk, schema=arrow_schema, preserve_index=False))
+
+def read_sheet(path: str, sheet_name=0, cache_dir: str = CACHE_DIR,
+               schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """pd.read_excel for one sheet, served from a Parquet sidecar while the workbook is unchanged"""
+    # With a column -> type `schema` ('datetime', 'float' or 'string') only those columns
+    # are read, streamed in read-only mode straight into the sidecar
+    fingerprint = workbook_fingerprint(path)
+    prefix, sidecar = _sidecar_paths(fingerprint, sheet_name, schema, cache_dir)
+    if os.path.exists(sidecar):
+        try:
+            return pd.read_parquet(sidecar)
+        except Exception:
+            # Corrupt or unreadable sidecar, fall back to parsing the workbook
+            pass
+
+    tmp_path = f'{sidecar}.{os.getpid()}.tmp'
+    df = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        if schema:
+            _stream_to_parquet(path, sheet_name, schema, tmp_path)
+        else:
+            df = pd.read_excel(path, sheet_name=sheet_name)
+            df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, sidecar)
+        # Drop sidecars left behind by earlier versions of this workbook
+        for entry in os.listdir(cache_dir):
+            if entry.startswith(prefix) and entry.endswith('.parquet') and os.path.join(cache_dir, entry) != sidecar:
+                os.remove(os.path.join(cache_dir, entry))
+    except Exception:
+        # No Parquet engine, unserializable columns or read-only filesystem: serve uncached
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if df is None:
+            df = read_sheet_streaming(path, sheet_name, list(schema), schema) if schema else pd.read_excel(path, sheet_name=sheet_name)
+        return df
+    return pd.read_parquet(sidecar) if df is None else df
+
+def is_cached(path: str, sheet_name=0, cache_dir: str = CACHE_DIR,
+              schema: Optional[Dict[str, str]] = None) -> bool:
+    """Whether read_sheet would be served from an up-to-date sidecar"""
+    _, sidecar = _sidecar_paths(workbook_fingerprint(path), sheet_name, schema, cache_dir)
+    return os.path.exists(sidecar)
+
+def invalidate(path: str, sheet_name=0, cache_dir: str = CACHE_DIR) -> None:
+    """Remove every sidecar of `path` / `sheet_name`, forcing the next read to parse the workbook"""
+    name = _sidecar_name(os.path.abspath(path), sheet_name)
+    if not os.path.isdir(cache_dir):
+        return
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(f'{name}-') and entry.endswith('.parquet'):
+            os.remove(os.path.join(cache_dir, entry))